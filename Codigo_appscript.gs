@@ -3,6 +3,10 @@ const SPREADSHEET_ID = '';
 const TASK_SHEET_NAME = 'Tarefas';
 const LOG_SHEET_NAME = 'Logs';
 const CONFIG_SHEET_NAME = 'Configurações';
+const REMOVED_SHEET_NAME = 'Removidas';
+const TASK_HEADER = ['Task ID', 'Título', 'Descrição', 'Estado', 'Prioridade', 'Data Criação', 'Versão'];
+const TASK_COLUMNS = TASK_HEADER.length;
+const MAX_LINHAS_AVULSAS = 50;
 
 // Inicializar a planilha
 function initializeSheets() {
@@ -10,7 +14,12 @@ function initializeSheets() {
   let taskSheet = ss.getSheetByName(TASK_SHEET_NAME);
   if (!taskSheet) {
     taskSheet = ss.insertSheet(TASK_SHEET_NAME);
-    taskSheet.getRange('A1:F1').setValues([['Task ID', 'Título', 'Descrição', 'Estado', 'Prioridade', 'Data Criação']]);
+    taskSheet.getRange(1, 1, 1, TASK_COLUMNS).setValues([TASK_HEADER]);
+  }
+  let removedSheet = ss.getSheetByName(REMOVED_SHEET_NAME);
+  if (!removedSheet) {
+    removedSheet = ss.insertSheet(REMOVED_SHEET_NAME);
+    removedSheet.getRange('A1:B1').setValues([['Task ID', 'Versão']]);
   }
   let logSheet = ss.getSheetByName(LOG_SHEET_NAME);
   if (!logSheet) {
@@ -23,6 +32,143 @@ function initializeSheets() {
     configSheet.getRange('A1:B1').setValues([['Chave', 'Valor']]);
     configSheet.getRange('A2:B2').setValues([['estados', JSON.stringify(['To Do', 'In Progress', 'Done'])]]);
   }
+  if (configSheet.getRange('A3').getValue() !== 'versao') {
+    configSheet.getRange('A3:B3').setValues([['versao', 0]]);
+  }
+  // Versão do último envio completo: antes dela não há histórico de remoções
+  if (configSheet.getRange('A4').getValue() !== 'versao_completa') {
+    configSheet.getRange('A4:B4').setValues([['versao_completa', 0]]);
+  }
+}
+
+// Versão da planilha: incrementada a cada alteração aceita
+function lerVersao(configSheet) {
+  return Number(configSheet.getRange('B3').getValue()) || 0;
+}
+
+function gravarVersao(configSheet, versao) {
+  configSheet.getRange('B3').setValue(versao);
+}
+
+function lerVersaoCompleta(configSheet) {
+  return Number(configSheet.getRange('B4').getValue()) || 0;
+}
+
+// Converter uma tarefa em linha da planilha (a última coluna guarda a versão em que a linha mudou)
+// Sem o campo descricao (descrição sob demanda, não alterada) fica a descrição atual da linha
+function tarefaParaLinha(taskId, task, versao, descricaoAtual) {
+  return [
+    taskId,
+    task.titulo || '',
+    task.descricao !== undefined ? (task.descricao || '') : (descricaoAtual || ''),
+    task.estado || 'To Do',
+    task.prioridade || 'Média',
+    task.data_criacao || new Date().toISOString(),
+    versao
+  ];
+}
+
+// Converter uma linha da planilha em tarefa
+// Com semDescricao a descrição vai só como hash; o cliente a pede depois (?descricoes=...) se precisar
+function linhaParaTarefa(row, semDescricao) {
+  const tarefa = {
+    titulo: row[1] || '',
+    estado: row[3] || 'To Do',
+    prioridade: row[4] || 'Média',
+    data_criacao: row[5] || new Date().toISOString(),
+    rev: Number(row[6]) || 0
+  };
+  if (semDescricao) {
+    tarefa.descricao_hash = hashDescricao(row[2] || '');
+  } else {
+    tarefa.descricao = row[2] || '';
+  }
+  return tarefa;
+}
+
+// Mesmo cálculo do cliente (hash_descricao): MD5 do UTF-8, 12 primeiros dígitos hex
+function hashDescricao(texto) {
+  const bytes = Utilities.computeDigest(Utilities.DigestAlgorithm.MD5, texto.toString(), Utilities.Charset.UTF_8);
+  return bytes.map(function(b) { return ((b + 256) % 256).toString(16).padStart(2, '0'); }).join('').substring(0, 12);
+}
+
+// Descrições atuais das tarefas pedidas, lidas só das colunas de id e descrição
+function descricoesPorId(taskSheet, ids) {
+  const descricoes = {};
+  const ultimaLinha = taskSheet.getLastRow();
+  if (ultimaLinha < 2) {
+    return descricoes;
+  }
+  const pedidas = {};
+  ids.forEach(function(taskId) { pedidas[taskId] = true; });
+  const linhas = taskSheet.getRange(2, 1, ultimaLinha - 1, 3).getValues();
+  linhas.forEach(function(row) {
+    const taskId = row[0].toString();
+    if (pedidas[taskId]) {
+      descricoes[taskId] = row[2] || '';
+    }
+  });
+  return descricoes;
+}
+
+// Índice task-id → número da linha e task-id → versão, lidos só das colunas A e de versão
+function indiceLinhas(taskSheet) {
+  const indice = {};
+  const versoes = {};
+  const ultimaLinha = taskSheet.getLastRow();
+  if (ultimaLinha < 2) {
+    return { indice: indice, versoes: versoes };
+  }
+  const ids = taskSheet.getRange(2, 1, ultimaLinha - 1, 1).getValues();
+  const revs = taskSheet.getRange(2, TASK_COLUMNS, ultimaLinha - 1, 1).getValues();
+  for (let i = 0; i < ids.length; i++) {
+    indice[ids[i][0].toString()] = i + 2;
+    versoes[ids[i][0].toString()] = Number(revs[i][0]) || 0;
+  }
+  return { indice: indice, versoes: versoes };
+}
+
+// Aplicar um delta (tarefas alteradas e removidas) linha a linha. Uma tarefa cuja linha
+// mudou depois da revisão em que o cliente se baseou (task.rev) não é gravada: volta em
+// 'conflitos' para o cliente mesclar e reenviar
+function aplicarDelta(taskSheet, removedSheet, dados, versao, conflitos) {
+  const linhas = indiceLinhas(taskSheet);
+  const indice = linhas.indice;
+  const novas = [];
+  const alteradas = dados.alteradas || {};
+  let gravadas = 0;
+  for (const taskId in alteradas) {
+    const revBase = Number(alteradas[taskId].rev) || 0;
+    if (indice[taskId] && linhas.versoes[taskId] > revBase) {
+      conflitos[taskId] = linhaParaTarefa(taskSheet.getRange(indice[taskId], 1, 1, TASK_COLUMNS).getValues()[0]);
+      continue;
+    }
+    gravadas++;
+    const descricaoAtual = alteradas[taskId].descricao === undefined && indice[taskId]
+      ? taskSheet.getRange(indice[taskId], 3).getValue() : '';
+    const linha = tarefaParaLinha(taskId, alteradas[taskId], versao, descricaoAtual);
+    if (indice[taskId]) {
+      taskSheet.getRange(indice[taskId], 1, 1, TASK_COLUMNS).setValues([linha]);
+    } else {
+      novas.push(linha);
+    }
+  }
+  if (novas.length > 0) {
+    taskSheet.getRange(taskSheet.getLastRow() + 1, 1, novas.length, TASK_COLUMNS).setValues(novas);
+  }
+  // Registrar remoções para o pull incremental dos outros clientes
+  const idsRemovidos = (dados.removidas || []).filter(function(taskId) { return indice[taskId]; });
+  if (idsRemovidos.length > 0) {
+    removedSheet.getRange(removedSheet.getLastRow() + 1, 1, idsRemovidos.length, 2)
+      .setValues(idsRemovidos.map(function(taskId) { return [taskId, versao]; }));
+  }
+  // Remover de baixo para cima para não invalidar os números de linha do índice
+  const linhasRemovidas = (dados.removidas || [])
+    .map(function(taskId) { return indice[taskId]; })
+    .filter(function(linha) { return linha; })
+    .sort(function(a, b) { return b - a; });
+  linhasRemovidas.forEach(function(linha) { taskSheet.deleteRow(linha); });
+  return gravadas + linhasRemovidas.length;
 }
 
 // Registrar log
@@ -34,6 +180,17 @@ function registrarLog(sheet, tipo, mensagem) {
   }
 }
 
+// Ler o corpo do POST; com a opção "gzip" do cliente o JSON chega compactado em base64
+// dentro de {"gzip": "..."} (o doPost não tem acesso aos bytes crus nem ao Content-Encoding)
+function lerCorpo(conteudo) {
+  const dados = JSON.parse(conteudo);
+  if (dados && typeof dados.gzip === 'string') {
+    const compactado = Utilities.newBlob(Utilities.base64Decode(dados.gzip), 'application/x-gzip');
+    return JSON.parse(Utilities.ungzip(compactado).getDataAsString('UTF-8'));
+  }
+  return dados;
+}
+
 // Receber atualizações (tarefas e estados)
 function doPost(e) {
   initializeSheets();
@@ -41,29 +198,38 @@ function doPost(e) {
   const taskSheet = ss.getSheetByName(TASK_SHEET_NAME);
   const logSheet = ss.getSheetByName(LOG_SHEET_NAME);
   const configSheet = ss.getSheetByName(CONFIG_SHEET_NAME);
+  const removedSheet = ss.getSheetByName(REMOVED_SHEET_NAME);
+  const lock = LockService.getScriptLock();
   try {
-    const dados = JSON.parse(e.postData.contents);
+    lock.waitLock(30000);
+    const dados = lerCorpo(e.postData.contents);
+    const versao = lerVersao(configSheet) + 1;
 
-    // Atualizar tarefas
-    if (dados.tarefas) {
+    // Delta: conflitos são verificados por tarefa, pela revisão de cada linha
+    const conflitos = {};
+    if (dados.modo === 'delta') {
+      const total = aplicarDelta(taskSheet, removedSheet, dados, versao, conflitos);
+      registrarLog(logSheet, 'Sucesso', `Delta aplicado com ${total} alterações e ${Object.keys(conflitos).length} conflitos`);
+    }
+
+    // Atualizar tarefas (envio completo)
+    if (dados.modo !== 'delta' && dados.tarefas) {
       const tarefas = dados.tarefas;
+      // Tarefas enviadas sem descrição (o cliente ainda não a baixou) mantêm a da planilha
+      const semDescricao = Object.keys(tarefas).filter(function(taskId) { return tarefas[taskId].descricao === undefined; });
+      const descricoesAtuais = semDescricao.length > 0 ? descricoesPorId(taskSheet, semDescricao) : {};
       taskSheet.clear();
-      taskSheet.appendRow(['Task ID', 'Título', 'Descrição', 'Estado', 'Prioridade', 'Data Criação']);
+      taskSheet.appendRow(TASK_HEADER);
       const rows = [];
       for (const taskId in tarefas) {
-        const task = tarefas[taskId];
-        rows.push([
-          taskId,
-          task.titulo || '',
-          task.descricao || '',
-          task.estado || 'To Do',
-          task.prioridade || 'Média',
-          task.data_criacao || new Date().toISOString()
-        ]);
+        rows.push(tarefaParaLinha(taskId, tarefas[taskId], versao, descricoesAtuais[taskId]));
       }
       if (rows.length > 0) {
-        taskSheet.getRange(2, 1, rows.length, 6).setValues(rows);
+        taskSheet.getRange(2, 1, rows.length, TASK_COLUMNS).setValues(rows);
       }
+      // Sem histórico de remoções anterior a este envio: quem estiver atrás recebe tudo
+      removedSheet.getRange(2, 1, Math.max(removedSheet.getLastRow() - 1, 1), 2).clearContent();
+      configSheet.getRange('B4').setValue(versao);
       registrarLog(logSheet, 'Sucesso', `Planilha atualizada com ${rows.length} tarefas`);
     }
 
@@ -74,48 +240,105 @@ function doPost(e) {
       registrarLog(logSheet, 'Sucesso', `Estados atualizados: ${estados.join(', ')}`);
     }
 
-    return ContentService.createTextOutput(JSON.stringify({ status: 'success', message: 'Dados sincronizados com sucesso' }))
+    gravarVersao(configSheet, versao);
+    const resposta = { status: 'success', message: 'Dados sincronizados com sucesso', versao: versao, versao_anterior: versao - 1, conflitos: conflitos };
+    return ContentService.createTextOutput(JSON.stringify(resposta))
       .setMimeType(ContentService.MimeType.JSON);
   } catch (error) {
     registrarLog(logSheet, 'Erro', `Falha ao processar doPost: ${error.message}`);
     return ContentService.createTextOutput(JSON.stringify({ status: 'error', message: error.message }))
       .setMimeType(ContentService.MimeType.JSON);
+  } finally {
+    lock.releaseLock();
+  }
+}
+
+// Ler apenas as linhas cuja versão é maior que 'desde' (a coluna de versão é lida sozinha)
+function linhasAlteradasDesde(taskSheet, desde) {
+  const ultimaLinha = taskSheet.getLastRow();
+  if (ultimaLinha < 2) {
+    return [];
+  }
+  const versoes = taskSheet.getRange(2, TASK_COLUMNS, ultimaLinha - 1, 1).getValues();
+  const numeros = [];
+  for (let i = 0; i < versoes.length; i++) {
+    if ((Number(versoes[i][0]) || 0) > desde) {
+      numeros.push(i + 2);
+    }
+  }
+  if (numeros.length > MAX_LINHAS_AVULSAS) {
+    // Muitas linhas: uma leitura em bloco sai mais barata que várias leituras avulsas
+    const todas = taskSheet.getRange(2, 1, ultimaLinha - 1, TASK_COLUMNS).getValues();
+    return numeros.map(function(numero) { return todas[numero - 2]; });
+  }
+  return numeros.map(function(numero) {
+    return taskSheet.getRange(numero, 1, 1, TASK_COLUMNS).getValues()[0];
+  });
+}
+
+// Ids removidos depois da versão 'desde'
+function removidasDesde(removedSheet, desde) {
+  const ultimaLinha = removedSheet.getLastRow();
+  if (ultimaLinha < 2) {
+    return [];
   }
+  return removedSheet.getRange(2, 1, ultimaLinha - 1, 2).getValues()
+    .filter(function(row) { return row[0] !== '' && (Number(row[1]) || 0) > desde; })
+    .map(function(row) { return row[0].toString(); });
 }
 
 // Retornar tarefas e estados
+// Com ?desde=<versão> retorna só o que mudou depois dela, ou status 'inalterado'
+// Com ?sem_descricao=1 as descrições vão como hash; ?descricoes=id1,id2 retorna só essas descrições
 function doGet(e) {
   initializeSheets();
   const ss = SpreadsheetApp.openById(SPREADSHEET_ID);
   const taskSheet = ss.getSheetByName(TASK_SHEET_NAME);
   const logSheet = ss.getSheetByName(LOG_SHEET_NAME);
   const configSheet = ss.getSheetByName(CONFIG_SHEET_NAME);
+  const removedSheet = ss.getSheetByName(REMOVED_SHEET_NAME);
   try {
-    // Carregar tarefas
-    const rows = taskSheet.getDataRange().getValues();
-    rows.shift();
-    const tarefas = {};
-    rows.forEach(function(row) {
-      const taskId = row[0].toString();
-      tarefas[taskId] = {
-        titulo: row[1] || '',
-        descricao: row[2] || '',
-        estado: row[3] || 'To Do',
-        prioridade: row[4] || 'Média',
-        data_criacao: row[5] || new Date().toISOString()
-      };
-    });
+    const versao = lerVersao(configSheet);
+    const parametros = e && e.parameter ? e.parameter : {};
+    if (parametros.descricoes) {
+      const descricoes = descricoesPorId(taskSheet, parametros.descricoes.split(','));
+      return ContentService.createTextOutput(JSON.stringify({ descricoes: descricoes, versao: versao }))
+        .setMimeType(ContentService.MimeType.JSON);
+    }
+    const semDescricao = parametros.sem_descricao === '1';
+    const parametro = parametros.desde;
+    const desde = parametro === undefined || parametro === '' ? null : Number(parametro);
+    if (desde !== null && desde === versao) {
+      return ContentService.createTextOutput(JSON.stringify({ status: 'inalterado', versao: versao, descricoes_sob_demanda: true }))
+        .setMimeType(ContentService.MimeType.JSON);
+    }
 
     // Carregar estados
     const configData = configSheet.getRange('A2:B2').getValues();
     const estados = configData[0][0] === 'estados' ? JSON.parse(configData[0][1]) : ['To Do', 'In Progress', 'Done'];
 
-    registrarLog(logSheet, 'Sucesso', `Retornadas ${Object.keys(tarefas).length} tarefas e ${estados.length} estados via doGet`);
-    return ContentService.createTextOutput(JSON.stringify({ tarefas, estados }))
+    const tarefas = {};
+    const incremental = desde !== null && !isNaN(desde) && desde < versao && desde >= lerVersaoCompleta(configSheet);
+    if (incremental) {
+      linhasAlteradasDesde(taskSheet, desde).forEach(function(row) {
+        tarefas[row[0].toString()] = linhaParaTarefa(row, semDescricao);
+      });
+      const removidas = removidasDesde(removedSheet, desde);
+      return ContentService.createTextOutput(JSON.stringify({ incremental: true, tarefas, removidas, estados, versao, descricoes_sob_demanda: true }))
+        .setMimeType(ContentService.MimeType.JSON);
+    }
+
+    // Carregar tarefas (cópia completa)
+    const rows = taskSheet.getDataRange().getValues();
+    rows.shift();
+    rows.forEach(function(row) {
+      tarefas[row[0].toString()] = linhaParaTarefa(row, semDescricao);
+    });
+    return ContentService.createTextOutput(JSON.stringify({ tarefas, estados, versao, descricoes_sob_demanda: true }))
       .setMimeType(ContentService.MimeType.JSON);
   } catch (error) {
     registrarLog(logSheet, 'Erro', `Falha ao processar doGet: ${error.message}`);
     return ContentService.createTextOutput(JSON.stringify({ status: 'error', message: error.message }))
       .setMimeType(ContentService.MimeType.JSON);
   }
-}
\ No newline at end of file
+}
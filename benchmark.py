@@ -0,0 +1,323 @@
+# Benchmark headless do Gerenciador de Tarefas
+# Gera quadros sintéticos, mede as operações mais pesadas de main.py e imprime o resultado em JSON
+# (para comparar entre commits). A planilha é substituída por um servidor HTTP local que fala o
+# mesmo protocolo do Codigo_appscript.gs.
+#
+# Uso:
+#   python benchmark.py --tamanhos 100,10000,100000 --estados 5 --repeticoes 3 --saida resultado.json
+# Em máquinas sem tela:
+#   xvfb-run -a python benchmark.py
+import argparse
+import base64
+import gzip
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PRIORIDADES = ["Alta", "Média", "Baixa"]
+
+
+# Servidor local que imita o Apps Script (doGet/doPost com versões e revisões por tarefa)
+class PlanilhaLocal(BaseHTTPRequestHandler):
+    dados = {"versao": 0, "tarefas": {}, "revisoes": {}, "removidas": {}, "estados": []}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def responder(self, corpo):
+        conteudo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def linha(self, task_id, sem_descricao):
+        task = dict(self.dados["tarefas"][task_id], rev=self.dados["revisoes"][task_id])
+        if sem_descricao:
+            task["descricao_hash"] = hashlib.md5(task.pop("descricao", "").encode("utf-8")).hexdigest()[:12]
+        return task
+
+    def do_GET(self):
+        dados = self.dados
+        parametros = parse_qs(urlparse(self.path).query)
+        desde = parametros.get("desde")
+        sem_descricao = parametros.get("sem_descricao") == ["1"]
+        with self.lock:
+            if "descricoes" in parametros:
+                ids = parametros["descricoes"][0].split(",")
+                return self.responder({"descricoes": {task_id: dados["tarefas"][task_id].get("descricao", "")
+                                                      for task_id in ids if task_id in dados["tarefas"]},
+                                       "versao": dados["versao"]})
+            if desde is not None and int(desde[0]) == dados["versao"]:
+                return self.responder({"status": "inalterado", "versao": dados["versao"], "descricoes_sob_demanda": True})
+            if desde is not None:
+                desde = int(desde[0])
+                return self.responder({
+                    "incremental": True,
+                    "tarefas": {task_id: self.linha(task_id, sem_descricao)
+                                for task_id in dados["tarefas"] if dados["revisoes"][task_id] > desde},
+                    "removidas": [task_id for task_id, versao in dados["removidas"].items() if versao > desde],
+                    "estados": dados["estados"],
+                    "versao": dados["versao"],
+                    "descricoes_sob_demanda": True
+                })
+            self.responder({"tarefas": {task_id: self.linha(task_id, sem_descricao) for task_id in dados["tarefas"]},
+                            "estados": dados["estados"], "versao": dados["versao"], "descricoes_sob_demanda": True})
+
+    def do_POST(self):
+        dados = self.dados
+        corpo = self.rfile.read(int(self.headers["Content-Length"]))
+        payload = json.loads(corpo)
+        if isinstance(payload.get("gzip"), str):
+            # Mesmo envelope que o doPost desfaz com Utilities.ungzip
+            payload = json.loads(gzip.decompress(base64.b64decode(payload["gzip"])))
+        with self.lock:
+            versao_anterior = dados["versao"]
+            versao = versao_anterior + 1
+            conflitos = {}
+            if payload.get("modo") == "delta":
+                for task_id, task in payload.get("alteradas", {}).items():
+                    revisao = dados["revisoes"].get(task_id, 0)
+                    if task_id in dados["tarefas"] and revisao > task.get("rev", 0):
+                        conflitos[task_id] = dict(dados["tarefas"][task_id], rev=revisao)
+                        continue
+                    anterior = dados["tarefas"].get(task_id, {})
+                    dados["tarefas"][task_id] = {k: v for k, v in task.items() if k != "rev"}
+                    dados["tarefas"][task_id].setdefault("descricao", anterior.get("descricao", ""))
+                    dados["revisoes"][task_id] = versao
+                for task_id in payload.get("removidas", []):
+                    dados["tarefas"].pop(task_id, None)
+                    dados["removidas"][task_id] = versao
+            else:
+                anteriores = dados["tarefas"]
+                dados["tarefas"] = {task_id: {k: v for k, v in task.items() if k != "rev"}
+                                    for task_id, task in payload.get("tarefas", {}).items()}
+                for task_id, task in dados["tarefas"].items():
+                    task.setdefault("descricao", anteriores.get(task_id, {}).get("descricao", ""))
+                dados["revisoes"] = {task_id: versao for task_id in dados["tarefas"]}
+                dados["removidas"] = {}
+            dados["estados"] = payload.get("estados", dados["estados"])
+            dados["versao"] = versao
+        self.responder({"status": "success", "versao": versao, "versao_anterior": versao_anterior,
+                        "conflitos": conflitos})
+
+
+# Função para iniciar o servidor local; retorna a URL usada no lugar do Apps Script
+def iniciar_planilha_local():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), PlanilhaLocal)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_port}/exec"
+
+
+# Função para gerar um quadro sintético com n tarefas distribuídas entre os estados
+def gerar_quadro(n, estados, semente=42):
+    aleatorio = random.Random(semente)
+    tarefas = {}
+    for i in range(1, n + 1):
+        tarefas[str(i)] = {
+            "titulo": f"Tarefa sintética {i} " + "x" * aleatorio.randint(0, 40),
+            "descricao": "Descrição " * aleatorio.randint(1, 30),
+            "estado": aleatorio.choice(estados),
+            "prioridade": aleatorio.choice(PRIORIDADES),
+            "data_criacao": "2024-01-01 12:00:00"
+        }
+    return tarefas
+
+
+# Função para medir uma operação várias vezes; preparar() roda antes de cada repetição, fora da medição
+def medir(operacao, repeticoes, preparar=None, finalizar=None):
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        operacao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if finalizar:
+            finalizar()
+    return {"mediana_ms": round(statistics.median(tempos), 3), "min_ms": round(min(tempos), 3),
+            "max_ms": round(max(tempos), 3), "repeticoes": repeticoes}
+
+
+# Função para preparar um HOME temporário com config.json apontando para o servidor local
+def preparar_ambiente(url, estados, armazenamento, renderizacao):
+    home = tempfile.mkdtemp(prefix="taskmanager-bench-")
+    os.environ["HOME"] = home
+    os.environ["USERPROFILE"] = home
+    data_dir = os.path.join(home, "TaskManagerData")
+    os.makedirs(data_dir)
+    config = {"url": url, "estados": estados, "cores_colunas": {}, "armazenamento": armazenamento,
+              "renderizacao": renderizacao, "auto_sincronizacao": {"ativa": False}}
+    with open(os.path.join(data_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=4, ensure_ascii=False)
+    return home
+
+
+def versao_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+# Função para executar todas as medições de um tamanho de quadro
+def medir_tamanho(main, n, estados, repeticoes):
+    janela = main.janela
+    resultado = {}
+    tarefas = gerar_quadro(n, estados)
+    ids = list(tarefas)
+
+    def atualizar_tela():
+        janela.update_idletasks()
+        janela.update()
+
+    # Armazenamento
+    resultado["salvar_tarefas"] = medir(lambda: main.salvar_tarefas(dict(tarefas)), repeticoes)
+    resultado["carregar_tarefas"] = medir(main.carregar_tarefas, repeticoes)
+    main.salvar_tarefas(dict(tarefas))
+
+    # Quadro
+    def forcar_render_completo():
+        main._render_completo = True
+    resultado["atualizar_tarefas_completo"] = medir(lambda: (main.atualizar_tarefas(), janela.update_idletasks()),
+                                                    repeticoes, preparar=forcar_render_completo)
+
+    def editar_uma():
+        task_id = random.choice(ids)
+        main.definir_tarefa(task_id, dict(main.obter_tarefa(task_id), titulo=f"Editada {time.time()}"))
+    resultado["atualizar_tarefas_uma_edicao"] = medir(lambda: (main.atualizar_tarefas(), janela.update_idletasks()),
+                                                      repeticoes, preparar=editar_uma)
+
+    # Arrastar e soltar: evento sintético no centro da coluna de destino
+    class EventoSoltar:
+        pass
+
+    def preparar_soltar():
+        task_id = random.choice(ids)
+        estado_atual = main.obter_tarefa(task_id).get("estado")
+        destino = next(estado for estado in estados if estado != estado_atual)
+        canvas = main.colunas[destino]["canvas"]
+        EventoSoltar.x_root = canvas.winfo_rootx() + canvas.winfo_width() // 2
+        EventoSoltar.y_root = canvas.winfo_rooty() + canvas.winfo_height() // 2
+        EventoSoltar.task_id = task_id
+        main.arrastando = task_id
+    resultado["soltar_tarefa"] = medir(lambda: (main.soltar_tarefa(EventoSoltar, EventoSoltar.task_id),
+                                                janela.update_idletasks()),
+                                       repeticoes, preparar=preparar_soltar)
+
+    # Colunas
+    def girar_estados():
+        main.estados.append(main.estados.pop(0))
+    resultado["reordenar_colunas"] = medir(lambda: (main.reordenar_colunas(), janela.update_idletasks()),
+                                           repeticoes, preparar=girar_estados)
+
+    def novo_estado():
+        main.estados.append(f"Bench {time.time()}")
+
+    def remover_estado():
+        main.estados.pop()
+        main.reordenar_colunas()
+    resultado["reordenar_colunas_novo_estado"] = medir(lambda: (main.reordenar_colunas(), janela.update_idletasks()),
+                                                       repeticoes, preparar=novo_estado, finalizar=remover_estado)
+
+    larguras = iter([1000, 1400] * repeticoes)
+
+    def redimensionar():
+        janela.geometry(f"{next(larguras)}x700")
+        atualizar_tela()
+        if hasattr(main._atualizar_layout_colunas, "last_width"):
+            del main._atualizar_layout_colunas.last_width
+    resultado["atualizar_layout_colunas"] = medir(lambda: (main._atualizar_layout_colunas(), atualizar_tela()),
+                                                  repeticoes, preparar=redimensionar)
+    resultado["widgets_materializados"] = len(main.tarefas_widgets)
+
+    # Sincronização com a planilha local
+    def sem_versao():
+        main.versao_planilha = None
+    resultado["enviar_completo"] = medir(main.enviar_tarefas_planilha, repeticoes, preparar=sem_versao,
+                                         finalizar=atualizar_tela)
+
+    def editar_dez():
+        alteradas = {}
+        for task_id in random.sample(ids, min(10, len(ids))):
+            alteradas[task_id] = dict(main.obter_tarefa(task_id), prioridade=random.choice(PRIORIDADES))
+        main.salvar_alteracoes_tarefas(alteradas=alteradas)
+    resultado["enviar_delta_10"] = medir(main.enviar_tarefas_planilha, repeticoes, preparar=editar_dez,
+                                         finalizar=atualizar_tela)
+    resultado["buscar_completo"] = medir(main.buscar_da_planilha, repeticoes, preparar=sem_versao,
+                                         finalizar=atualizar_tela)
+    resultado["buscar_inalterado"] = medir(main.buscar_da_planilha, repeticoes, finalizar=atualizar_tela)
+    resultado["bytes_quadro_json"] = len(json.dumps(tarefas, ensure_ascii=False).encode("utf-8"))
+    return resultado
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark headless do Gerenciador de Tarefas")
+    parser.add_argument("--tamanhos", default="100,10000,100000", help="Quantidades de tarefas, separadas por vírgula")
+    parser.add_argument("--estados", type=int, default=5, help="Número de colunas")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--armazenamento", default="json", choices=["json", "diario", "colunar", "sqlite"])
+    parser.add_argument("--renderizacao", default="widgets", choices=["widgets", "canvas"])
+    parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    estados = [f"Estado {i + 1}" for i in range(args.estados)]
+    url = iniciar_planilha_local()
+    preparar_ambiente(url, estados, args.armazenamento, args.renderizacao)
+
+    # main.py lê o config.json e cria a janela ao ser importado; os logs dele não entram no JSON
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    logs = io.StringIO()
+    with contextlib.redirect_stdout(logs):
+        import main
+        main.agendar_envio = lambda: None  # Envios são medidos explicitamente, não pelo trabalhador
+        main.janela.geometry("1200x700")
+        main.janela.update()
+        for estado in main.estados:
+            main.criar_coluna(estado)
+        main.janela.update()
+
+    relatorio = {
+        "commit": versao_git(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "estados": args.estados,
+        "armazenamento": args.armazenamento,
+        "renderizacao": args.renderizacao,
+        "resultados": {}
+    }
+    for n in [int(t) for t in args.tamanhos.split(",") if t.strip()]:
+        print(f"[INFO] Medindo quadro com {n} tarefas...", file=sys.stderr)
+        with contextlib.redirect_stdout(logs):
+            relatorio["resultados"][str(n)] = medir_tamanho(main, n, estados, args.repeticoes)
+        logs.seek(0)
+        logs.truncate()
+
+    saida = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(saida + "\n")
+        print(f"[INFO] Resultado salvo em: {args.saida}", file=sys.stderr)
+    else:
+        print(saida)
+    main.janela.destroy()
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -1,27 +1,55 @@
+import time
+_INICIO_PROCESSO = time.perf_counter()
 import os
 import json
+import gzip
+import base64
+import hashlib
 import random
+import secrets
+import sqlite3
+import mmap
+import struct
+from array import array
 import sys
-import time
+import queue
 import tkinter as tk
 from tkinter import ttk, Text, simpledialog, messagebox, colorchooser
 import threading
-from pystray import Icon, MenuItem, Menu
-from PIL import Image, ImageTk
-import requests
+import functools
+import bisect
+import re
+import unicodedata
+from collections import deque, OrderedDict
 from datetime import datetime
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+# pystray, PIL e requests/urllib3 são importados sob demanda (ver importar_rede, create_icon
+# e carregar_icone_janela): são os módulos mais pesados da inicialização do executável
 
 # Configurações
 REGISTRO_TAREFAS = "tasks.json"
+DIARIO_TAREFAS = "tasks.journal"
+BANCO_TAREFAS = "tasks.db"
+COLUNAR_TAREFAS = "tasks.col"
+ESTADO_SINCRONIZACAO = "sync.json"
+CACHE_QUADRO = "board_cache.json"
+HISTORICO_INICIALIZACAO = "startup_times.jsonl"
+FILA_SAIDA = "outbox.jsonl"  # Alterações locais ainda não aceitas pela planilha (append-only)
+PASTA_SNAPSHOTS = "snapshots"  # Cópias das últimas versões boas do tasks.json
 CONFIG_ARQUIVO = "config.json"
 DATA_DIR = os.path.join(os.path.expanduser("~"), "TaskManagerData")  # External directory: ~/TaskManagerData
 ESTADOS_PADRAO = ["To Do", "In Progress", "Done"]
 estados = ESTADOS_PADRAO.copy()
 colunas = {}
 tarefas_widgets = {}
+_snapshot_render = {}  # task_id -> (estado, título, prioridade) da última renderização
+_ids_para_render = set()  # Tarefas alteradas no repositório desde a última renderização
+_render_completo = True  # Repositório substituído/recarregado: reconstruir as colunas
+_termos_filtro = None  # Termos da barra de busca (None = quadro completo)
+tarefas_selecionadas = set()  # Seleção múltipla (Ctrl+clique) para as ações em lote
+COR_CARTAO = "#000000"
+COR_CARTAO_SELECIONADO = "#1f4e79"
 CORES_COLUNAS = {}  # Already initialized globally
+CONFIG_EXTRAS = {}  # Demais chaves do config.json (armazenamento, sincronização, ...)
 resize_timer = None
 layout_lock = False
 arrastando = None
@@ -31,19 +59,239 @@ coluna_arrastada = None
 widget_fantasma_coluna = None
 ANIMATION_DURATION = 400  # Animation duration in milliseconds
 ANIMATION_STEPS = 20     # Number of animation steps for smooth movement
+ALTURA_CARTAO = 60       # Altura fixa dos cartões (necessária para a virtualização das colunas)
+ESPACO_CARTAO = 4        # Espaço vertical entre cartões
+SOBRA_VIRTUALIZACAO = 3  # Cartões materializados além da área visível, acima e abaixo
+MAX_TITULO_DESENHADO = 90  # Texto não tem recorte no canvas: títulos longos são abreviados
 CORES_PASTEL = {
     "To Do": "#B3E5FC",
     "In Progress": "#C8E6C9",
     "Done": "#F3E5F5",
     "default": "#FFE0B2"
 }
-from PIL import Image
+_quadro_em_cache = None  # Resumo das tarefas exibido até a carga completa terminar (inicialização rápida)
+
+
+# Modelo compacto de tarefa: os campos conhecidos (inclusive rev e descricao_hash, que quase
+# toda tarefa sincronizada tem) ficam em __slots__, sem um dicionário por tarefa, e estado e
+# prioridade são strings internadas (uma cópia por valor distinto) e a data de criação é
+# interpretada na primeira vez que é pedida. Só chaves desconhecidas vão para "extras". A interface de leitura é a de um dicionário (get, [], in, items, dict(task)),
+# então o restante do código não precisa distinguir os dois formatos
+PRIORIDADES = ("Alta", "Média", "Baixa")
+PRIORIDADE_PADRAO = "Média"
+NIVEL_PRIORIDADE = {prioridade: nivel for nivel, prioridade in enumerate(PRIORIDADES)}
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+_AUSENTE = object()  # Campo que a tarefa não tem (diferente de um campo com valor None)
+
+class Tarefa:
+    CAMPOS = ("titulo", "descricao", "estado", "prioridade", "data_criacao", "rev", "descricao_hash")
+    __slots__ = CAMPOS + ("extras", "_criado_em")
+
+    def __init__(self, titulo=_AUSENTE, descricao=_AUSENTE, estado=_AUSENTE, prioridade=_AUSENTE,
+                 data_criacao=_AUSENTE, rev=_AUSENTE, descricao_hash=_AUSENTE, extras=None):
+        self.titulo = titulo
+        self.descricao = descricao
+        self.estado = sys.intern(estado) if type(estado) is str else estado
+        self.prioridade = sys.intern(prioridade) if type(prioridade) is str else prioridade
+        self.data_criacao = data_criacao
+        self.rev = rev
+        self.descricao_hash = descricao_hash
+        self.extras = extras or None
+        self._criado_em = _AUSENTE
+
+    @classmethod
+    def de_dict(cls, dados):
+        if type(dados) is cls:
+            return dados
+        extras = {chave: valor for chave, valor in dados.items() if chave not in cls.CAMPOS}
+        return cls(*(dados.get(campo, _AUSENTE) for campo in cls.CAMPOS), extras=extras)
+
+    def para_dict(self):
+        return dict(self.items())
+
+    # Interface de dicionário
+    def get(self, chave, padrao=None):
+        if chave in Tarefa.CAMPOS:
+            valor = getattr(self, chave)
+            return padrao if valor is _AUSENTE else valor
+        return self.extras.get(chave, padrao) if self.extras else padrao
+
+    def __getitem__(self, chave):
+        valor = self.get(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            raise KeyError(chave)
+        return valor
+
+    def __setitem__(self, chave, valor):
+        if chave in ("estado", "prioridade") and type(valor) is str:
+            valor = sys.intern(valor)
+        if chave in Tarefa.CAMPOS:
+            setattr(self, chave, valor)
+            if chave == "data_criacao":
+                self._criado_em = _AUSENTE
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[chave] = valor
+
+    def __contains__(self, chave):
+        return self.get(chave, _AUSENTE) is not _AUSENTE
+
+    def keys(self):
+        return [chave for chave, _ in self.items()]
+
+    def items(self):
+        itens = [(campo, getattr(self, campo)) for campo in Tarefa.CAMPOS]
+        itens = [(campo, valor) for campo, valor in itens if valor is not _AUSENTE]
+        return itens + list(self.extras.items()) if self.extras else itens
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.items())
+
+    def __eq__(self, outra):
+        if isinstance(outra, (Tarefa, dict)):
+            return dict(self.items()) == dict(outra.items())
+        return NotImplemented
 
+    __hash__ = None
 
-# Ensure the external data directory exists
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
-    print(f"[INFO] Created data directory: {DATA_DIR}")
+    def __repr__(self):
+        return f"Tarefa({self.para_dict()!r})"
+
+    # Valores derivados, baratos para ordenar e filtrar (usados pelos filtros data>= e prioridade>= da busca)
+    @property
+    def nivel_prioridade(self):
+        return NIVEL_PRIORIDADE.get(self.get("prioridade", PRIORIDADE_PADRAO), NIVEL_PRIORIDADE[PRIORIDADE_PADRAO])
+
+    @property
+    def criado_em(self):
+        if self._criado_em is _AUSENTE:
+            self._criado_em = interpretar_data(self.data_criacao)
+        return self._criado_em
+
+# Função para interpretar uma data de criação (None se ausente ou inválida)
+def interpretar_data(valor):
+    try:
+        # fromisoformat (em C) entende FORMATO_DATA e é bem mais rápido que strptime
+        return datetime.fromisoformat(valor)
+    except (TypeError, ValueError):
+        return None
+
+# Função para converter (no próprio dicionário) as tarefas carregadas para o modelo compacto
+def compactar_tarefas(tarefas):
+    if obter_config("tarefas_compactas", True):
+        for task_id, task in tarefas.items():
+            if type(task) is not Tarefa:
+                tarefas[task_id] = Tarefa.de_dict(task)
+    return tarefas
+
+# Função para serializar tarefas compactas com json.dump(s) (parâmetro default)
+def serializar_tarefa(obj):
+    if isinstance(obj, Tarefa):
+        return obj.para_dict()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+# Função para tirar do caminho um arquivo ilegível sem sobrescrever cópias anteriores;
+# retorna o novo nome (ex.: tasks.json.corrompido-20240501-101500-123456)
+def preservar_arquivo_danificado(caminho):
+    base = f"{caminho}.corrompido-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+    danificado, numero = base, 1
+    while os.path.exists(danificado):
+        danificado, numero = f"{base}-{numero}", numero + 1
+    os.rename(caminho, danificado)
+    return danificado
+
+# Ensure the external data directory exists (só é necessário na primeira gravação)
+def garantir_diretorio_dados():
+    if not os.path.exists(DATA_DIR):
+        os.makedirs(DATA_DIR)
+        print(f"[INFO] Created data directory: {DATA_DIR}")
+
+# Função para gravar um arquivo de forma atômica: escreve em um temporário, faz fsync e só então
+# o renomeia por cima do original. Uma queda no meio da gravação deixa o arquivo anterior intacto
+def gravar_arquivo_atomico(caminho, escrever, binario=False):
+    temporario = caminho + ".tmp"
+    with (open(temporario, "wb") if binario else open(temporario, "w", encoding="utf-8")) as f:
+        escrever(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+    try:
+        # Garante que a renomeação também chegou ao disco (não suportado no Windows)
+        descritor = os.open(os.path.dirname(caminho), os.O_RDONLY)
+        try:
+            os.fsync(descritor)
+        finally:
+            os.close(descritor)
+    except OSError:
+        pass
+
+def gravar_json_atomico(caminho, dados, **opcoes):
+    gravar_arquivo_atomico(caminho, lambda f: json.dump(dados, f, ensure_ascii=False, default=serializar_tarefa, **opcoes))
+
+# Instrumentação: tempos das operações críticas (últimas amostras de cada uma) e contadores.
+# Custa dois perf_counter e um append por chamada, então fica sempre ligada
+AMOSTRAS_METRICAS = 512
+_metricas_tempos = {}
+_metricas_contadores = {}
+_lock_metricas = threading.Lock()
+_ultimos_logs = {}  # evento -> [instante da última impressão, mensagens suprimidas desde então]
+
+def registrar_tempo(nome, ms):
+    with _lock_metricas:
+        amostras = _metricas_tempos.get(nome)
+        if amostras is None:
+            amostras = _metricas_tempos[nome] = deque(maxlen=AMOSTRAS_METRICAS)
+        amostras.append(ms)
+
+def contar(nome, quantidade=1):
+    with _lock_metricas:
+        _metricas_contadores[nome] = _metricas_contadores.get(nome, 0) + quantidade
+
+# Decorador para medir o tempo de cada chamada de uma função
+def instrumentar(nome):
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar_tempo(nome, (time.perf_counter() - inicio) * 1000)
+        return medida
+    return decorador
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+# Função para obter {nome: {n, p50, p95, max}} e os contadores atuais
+def resumo_metricas():
+    with _lock_metricas:
+        tempos = {nome: list(amostras) for nome, amostras in _metricas_tempos.items()}
+        contadores = dict(_metricas_contadores)
+    return {nome: {"n": len(valores), "p50": round(percentil(valores, 50), 2),
+                   "p95": round(percentil(valores, 95), 2), "max": round(max(valores), 2)}
+            for nome, valores in tempos.items() if valores}, contadores
+
+# Log estruturado (evento campo=valor ...) com limite de frequência por evento
+def log_evento(nivel, evento, intervalo=2.0, **campos):
+    agora = time.monotonic()
+    with _lock_metricas:
+        ultimo = _ultimos_logs.setdefault(evento, [0.0, 0])
+        if agora - ultimo[0] < intervalo:
+            ultimo[1] += 1
+            return
+        suprimidas, ultimo[0], ultimo[1] = ultimo[1], agora, 0
+    texto = " ".join(f"{chave}={valor}" for chave, valor in campos.items())
+    if suprimidas:
+        texto += f" suprimidas={suprimidas}"
+    print(f"[{nivel}] {evento} {texto}")
 
 # Função para gerar cor pastel aleatória
 def gerar_cor_pastel_aleatoria():
@@ -59,11 +307,11 @@ def obter_cor_coluna(estado):
 
 # Função para salvar configurações
 def salvar_configuracoes(url, estados, cores_colunas):
-    config = {"url": url, "estados": estados, "cores_colunas": cores_colunas}
+    config = dict(CONFIG_EXTRAS, url=url, estados=estados, cores_colunas=cores_colunas)
     config_path = os.path.join(DATA_DIR, CONFIG_ARQUIVO)
     try:
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
+        garantir_diretorio_dados()
+        gravar_json_atomico(config_path, config, indent=4)
         print(f"[INFO] Configurações salvas em: {config_path}")
     except Exception as e:
         print(f"[ERROR] Erro ao salvar configurações: {e}")
@@ -76,6 +324,8 @@ def carregar_configuracoes():
             with open(config_path, "r", encoding="utf-8") as f:
                 config = json.load(f)
                 CORES_COLUNAS.update(config.get("cores_colunas", {}))
+                CONFIG_EXTRAS.update({chave: valor for chave, valor in config.items()
+                                      if chave not in ("url", "estados", "cores_colunas")})
                 url = config.get("url", "")
                 # Validate URL
                 if url and not url.startswith(('http://', 'https://')):
@@ -85,38 +335,72 @@ def carregar_configuracoes():
                 return url, config.get("estados", ESTADOS_PADRAO)
         else:
             print(f"[INFO] config.json não encontrado. Criando novo arquivo em {config_path}.")
+            garantir_diretorio_dados()
             default_config = {
                 "url": "",
                 "estados": ESTADOS_PADRAO,
                 "cores_colunas": CORES_PASTEL
             }
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(default_config, f, indent=4, ensure_ascii=False)
+            gravar_json_atomico(config_path, default_config, indent=4)
             CORES_COLUNAS.update(CORES_PASTEL)
             return "", ESTADOS_PADRAO
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"[ERROR] Erro ao carregar configurações: {e}")
+        garantir_diretorio_dados()
         default_config = {
             "url": "",
             "estados": ESTADOS_PADRAO,
             "cores_colunas": CORES_PASTEL
         }
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(default_config, f, indent=4, ensure_ascii=False)
+        if os.path.exists(config_path):
+            # Preserva o arquivo ilegível para conferência em vez de sobrescrevê-lo
+            preservar_arquivo_danificado(config_path)
+        gravar_json_atomico(config_path, default_config, indent=4)
         CORES_COLUNAS.update(CORES_PASTEL)
         return "", ESTADOS_PADRAO
 
+# Função para ler uma opção avançada do config.json
+def obter_config(chave, padrao=None):
+    return CONFIG_EXTRAS.get(chave, padrao)
+
 # Carregar configurações e sincronizar URLs
 GOOGLE_SHEETS_URL, estados = carregar_configuracoes()
 GOOGLE_SHEETS_API_URL = GOOGLE_SHEETS_URL
 
 # Função para salvar tarefas localmente
+@instrumentar("salvar_tarefas")
 def salvar_tarefas(tarefas):
+    global _tarefas_memoria, _assinatura_registro, _registros_diario, _render_completo
     registro_path = os.path.join(DATA_DIR, REGISTRO_TAREFAS)
     try:
-        with open(registro_path, "w", encoding="utf-8") as f:
-            json.dump(tarefas, f, indent=4, ensure_ascii=False)
-        print(f"[INFO] Tarefas salvas em: {registro_path}")
+        with _lock_tarefas:
+            if tarefas is not _tarefas_memoria:
+                _render_completo = True
+                invalidar_indice_busca()
+                _cache_descricoes.clear()
+                compactar_tarefas(tarefas)
+            if modo_sqlite():
+                salvar_tarefas_sqlite(tarefas)
+                _tarefas_memoria = tarefas
+                _assinatura_registro = obter_assinatura_registro()
+                return
+            if modo_colunar():
+                registro_path = os.path.join(DATA_DIR, COLUNAR_TAREFAS)
+            guardar_snapshot_tarefas(registro_path)
+            if modo_colunar():
+                salvar_tarefas_colunar(registro_path, tarefas)
+            elif modo_diario():
+                # No modo diário o tasks.json é o snapshot compactado
+                gravar_json_atomico(registro_path, tarefas, separators=(",", ":"))
+            else:
+                gravar_json_atomico(registro_path, tarefas, indent=4)
+            if modo_diario():
+                open(os.path.join(DATA_DIR, DIARIO_TAREFAS), "w", encoding="utf-8").close()
+                _registros_diario = 0
+            # O que acabou de ser gravado passa a ser o estado autoritativo em memória
+            _tarefas_memoria = tarefas
+            _assinatura_registro = obter_assinatura_registro()
+        log_evento("INFO", "tarefas.salvas", arquivo=registro_path, total=len(tarefas))
     except Exception as e:
         print(f"[ERROR] Erro ao salvar tarefas: {e}")
 
@@ -132,17 +416,13 @@ def editar_nome_coluna(estado):
         if estado in CORES_COLUNAS:
             CORES_COLUNAS[novo_nome] = CORES_COLUNAS.pop(estado)
         # Update tasks
-        tarefas = carregar_tarefas()
-        for task_id, task in tarefas.items():
-            if task.get("estado") == estado:
-                task["estado"] = novo_nome
-        salvar_tarefas(tarefas)
+        renomear_estado_tarefas(estado, novo_nome)
         # Save configurations
         salvar_configuracoes(GOOGLE_SHEETS_URL, estados, CORES_COLUNAS)
-        # Update UI
-        reordenar_colunas()
+        # Update UI: a coluna existente só troca de rótulo
+        reordenar_colunas(renomeadas={estado: novo_nome})
         atualizar_tarefas()
-        enviar_tarefas_planilha()
+        agendar_envio()
         messagebox.showinfo("Estado Renomeado", f"Estado '{estado}' renomeado para '{novo_nome}'.")
     elif novo_nome in estados:
         messagebox.showwarning("Estado Existente", "Este nome de estado já existe.")
@@ -155,8 +435,8 @@ def excluir_coluna(estado):
     if len(estados) <= 1:
         messagebox.showwarning("Erro", "Não é possível excluir a última coluna.")
         return
-    tarefas = carregar_tarefas()
-    tarefas_na_coluna = [task_id for task_id, task in tarefas.items() if task.get("estado") == estado]
+    tarefas = obter_tarefas()
+    tarefas_na_coluna = ids_tarefas_no_estado(estado)
     if tarefas_na_coluna:
         opcao = messagebox.askyesnocancel(
             "Tarefas Encontradas",
@@ -175,12 +455,10 @@ def excluir_coluna(estado):
             if coluna_destino not in outras_colunas:
                 messagebox.showerror("Erro", "Coluna inválida selecionada.")
                 return
-            for task_id in tarefas_na_coluna:
-                tarefas[task_id]["estado"] = coluna_destino
+            salvar_alteracoes_tarefas(alteradas={task_id: dict(tarefas[task_id], estado=coluna_destino)
+                                                 for task_id in tarefas_na_coluna})
         else:  # Delete tasks
-            for task_id in tarefas_na_coluna:
-                del tarefas[task_id]
-        salvar_tarefas(tarefas)
+            salvar_alteracoes_tarefas(removidas=tarefas_na_coluna)
     # Remove the column
     estados.remove(estado)
     if estado in CORES_COLUNAS:
@@ -188,65 +466,925 @@ def excluir_coluna(estado):
     salvar_configuracoes(GOOGLE_SHEETS_URL, estados, CORES_COLUNAS)
     reordenar_colunas()
     atualizar_tarefas()
-    enviar_tarefas_planilha()
+    agendar_envio()
     messagebox.showinfo("Coluna Excluída", f"Coluna '{estado}' excluída com sucesso.")
 
-# Função para enviar tarefas e estados para a planilha (unchanged)
-def enviar_tarefas_planilha():
-    if not GOOGLE_SHEETS_API_URL:
-        janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ URL do Apps Script não configurada no config.json.\n", "info"))
-        return False
-    tarefas = carregar_tarefas()
-    payload = {"tarefas": tarefas, "estados": estados}
-    session = requests.Session()
-    retries = Retry(total=3, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
-    try:
-        print(f"[DEBUG] Enviando tarefas e estados para {GOOGLE_SHEETS_API_URL}")
-        response = session.post(GOOGLE_SHEETS_API_URL, json=payload, timeout=10)
-        print(f"[DEBUG] Resposta do servidor: {response.status_code}, {response.text}")
-        if response.status_code == 200:
-            resposta = response.json()
-            if resposta.get("status") == "success":
-                janela.after(0, lambda: texto_detalhes.insert(tk.END, "✅ Tarefas e estados sincronizados com a planilha.\n", "info"))
-                return True
-            else:
-                janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Erro do servidor: {resposta.get('message', 'Desconhecido')}\n", "info"))
-                return False
-        else:
-            janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Falha ao enviar dados: {response.status_code} - {response.text}\n", "info"))
-            return False
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] Erro ao enviar dados: {e}")
-        janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Erro ao enviar dados: {e}\n", "info"))
-        return False
-
 # Função para carregar tarefas locais
+@instrumentar("carregar_tarefas")
 def carregar_tarefas():
+    if modo_sqlite():
+        return carregar_tarefas_sqlite()
     registro_path = os.path.join(DATA_DIR, REGISTRO_TAREFAS)
+    colunar_path = os.path.join(DATA_DIR, COLUNAR_TAREFAS)
+    if modo_colunar() and os.path.exists(colunar_path):
+        try:
+            data = carregar_tarefas_colunar(colunar_path)
+            print(f"[INFO] {len(data)} tarefas carregadas de: {colunar_path}")
+            return reproduzir_diario(data)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"[ERROR] Erro ao carregar tarefas: {e}")
+            return recuperar_tarefas(colunar_path)
+    # Sem tasks.col ainda, o tasks.json (mais o diário) é lido e a próxima compactação o converte
     try:
         if os.path.exists(registro_path):
             with open(registro_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-                if isinstance(data, dict) and all(isinstance(v, dict) for v in data.values()):
-                    print(f"[INFO] Tarefas carregadas de: {registro_path}")
-                    return data
-                else:
-                    print(f"[WARNING] Arquivo tasks.json contém dados inválidos. Retornando vazio.")
-                    return {}
+            if tarefas_validas(data):
+                print(f"[INFO] Tarefas carregadas de: {registro_path}")
+                if modo_diario():
+                    data = reproduzir_diario(data)
+                return data
+            print(f"[WARNING] Arquivo tasks.json contém dados inválidos.")
+            return recuperar_tarefas(registro_path)
         else:
+            recuperadas = recuperar_tarefas(registro_path) if listar_snapshots() else None
+            if recuperadas is not None:
+                return recuperadas
             # Create empty tasks.json if it doesn't exist
             print(f"[INFO] tasks.json não encontrado. Criando novo arquivo em {registro_path}.")
-            with open(registro_path, "w", encoding="utf-8") as f:
-                json.dump({}, f, indent=4, ensure_ascii=False)
-            return {}
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+            gravar_json_atomico(registro_path, {}, indent=4)
+            return reproduzir_diario({}) if modo_diario() else {}
+    except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError) as e:
         print(f"[ERROR] Erro ao carregar tarefas: {e}")
-        # Create empty tasks.json in case of error
-        with open(registro_path, "w", encoding="utf-8") as f:
-            json.dump({}, f, indent=4, ensure_ascii=False)
+        return recuperar_tarefas(registro_path)
+
+def tarefas_validas(data):
+    return isinstance(data, dict) and all(isinstance(v, (dict, Tarefa)) for v in data.values())
+
+# Snapshots rotativos: antes de substituir o tasks.json, a versão atual (sempre completa, pois
+# é gravada de forma atômica) é guardada em snapshots/ no máximo a cada snapshot_intervalo_s
+# No modo colunar os snapshots .json de antes da primeira compactação também valem
+def listar_snapshots():
+    pasta = os.path.join(DATA_DIR, PASTA_SNAPSHOTS)
+    extensoes = (".col", ".json") if modo_colunar() else (".json",)
+    try:
+        nomes = [nome for nome in os.listdir(pasta) if nome.startswith("tasks-") and nome.endswith(extensoes)]
+    except OSError:
+        return []
+    # O nome traz a data: ordenar sem a extensão deixa .col e .json na ordem em que foram criados
+    nomes.sort(key=lambda nome: os.path.splitext(nome)[0], reverse=True)
+    return [os.path.join(pasta, nome) for nome in nomes]
+
+def guardar_snapshot_tarefas(registro_path):
+    try:
+        if not os.path.exists(registro_path):
+            return
+        snapshots = listar_snapshots()
+        intervalo = obter_config("snapshot_intervalo_s", 300)
+        if snapshots and time.time() - os.path.getmtime(snapshots[0]) < intervalo:
+            return
+        pasta = os.path.join(DATA_DIR, PASTA_SNAPSHOTS)
+        os.makedirs(pasta, exist_ok=True)
+        destino = os.path.join(pasta, f"tasks-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+                                      f"{os.path.splitext(registro_path)[1]}")
+        try:
+            # O rename atômico cria um novo arquivo, então o link continua apontando para a versão antiga
+            os.link(registro_path, destino)
+        except OSError:
+            import shutil
+            shutil.copy2(registro_path, destino)
+        os.utime(destino)
+        for antigo in snapshots[obter_config("snapshots_mantidos", 5) - 1:]:
+            os.remove(antigo)
+    except OSError as e:
+        print(f"[WARNING] Não foi possível guardar snapshot das tarefas: {e}")
+
+# Função para recuperar as tarefas do snapshot válido mais recente quando o tasks.json está
+# ilegível; o arquivo danificado é preservado e o recuperado volta a ser o tasks.json
+def recuperar_tarefas(registro_path):
+    if os.path.exists(registro_path):
+        danificado = preservar_arquivo_danificado(registro_path)
+        print(f"[WARNING] tasks.json ilegível preservado em {danificado}")
+    # O recuperado é gravado no formato do modo atual, no arquivo desse formato
+    destino = os.path.join(DATA_DIR, COLUNAR_TAREFAS) if modo_colunar() else registro_path
+    for snapshot in listar_snapshots():
+        try:
+            if snapshot.endswith(".col"):
+                # Lido por completo: o snapshot não fica mapeado em memória
+                data = carregar_tarefas_colunar(snapshot, descricoes_preguicosas=False)
+            else:
+                with open(snapshot, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            if not tarefas_validas(data):
+                continue
+        except (OSError, ValueError, UnicodeDecodeError, struct.error):
+            continue
+        print(f"[WARNING] Tarefas recuperadas do snapshot {os.path.basename(snapshot)} ({len(data)} tarefas).")
+        if modo_colunar():
+            salvar_tarefas_colunar(destino, data)
+        else:
+            gravar_json_atomico(destino, data, indent=4)
+        return reproduzir_diario(data) if modo_diario() else data
+    print("[ERROR] Nenhum snapshot válido encontrado. Iniciando com quadro vazio.")
+    if modo_colunar():
+        salvar_tarefas_colunar(destino, {})
+    else:
+        gravar_json_atomico(destino, {}, indent=4)
+    return reproduzir_diario({}) if modo_diario() else {}
+
+# Repositório de tarefas em memória: o disco só é lido na inicialização ou quando
+# o arquivo muda externamente (mtime/tamanho diferentes da última leitura/gravação)
+_tarefas_memoria = None
+_assinatura_registro = None
+_lock_tarefas = threading.RLock()
+
+def obter_assinatura_registro():
+    assinatura = []
+    for nome in (REGISTRO_TAREFAS, DIARIO_TAREFAS, BANCO_TAREFAS, COLUNAR_TAREFAS):
+        try:
+            info = os.stat(os.path.join(DATA_DIR, nome))
+            assinatura.append((info.st_mtime_ns, info.st_size))
+        except OSError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+# Função para obter todas as tarefas (somente leitura; use as funções abaixo para alterar).
+# O dicionário é o próprio repositório: para percorrê-lo fora de _lock_tarefas use copiar_tarefas
+def obter_tarefas():
+    global _tarefas_memoria, _assinatura_registro, _render_completo
+    with _lock_tarefas:
+        assinatura = obter_assinatura_registro()
+        if _tarefas_memoria is None or assinatura != _assinatura_registro:
+            if _tarefas_memoria is not None:
+                print("[INFO] tasks.json alterado externamente. Recarregando tarefas.")
+            _tarefas_memoria = compactar_tarefas(carregar_tarefas())
+            _cache_descricoes.clear()
+            _render_completo = True
+            invalidar_indice_busca()
+            _assinatura_registro = obter_assinatura_registro()
+        return _tarefas_memoria
+
+# Função para obter uma cópia rasa das tarefas, para percorrer fora de _lock_tarefas
+# (o trabalhador de envio e a sincronização alteram o dicionário em outras threads)
+def copiar_tarefas():
+    with _lock_tarefas:
+        return dict(obter_tarefas())
+
+# Função para obter uma tarefa pelo id
+# (a descrição pode não estar carregada: use obter_descricao)
+def obter_tarefa(task_id):
+    return obter_tarefas().get(task_id)
+
+# Função para listar os ids das tarefas de um estado (consulta indexada no modo SQLite)
+def ids_tarefas_no_estado(estado):
+    with _lock_tarefas:
+        tarefas = obter_tarefas()
+        if modo_sqlite():
+            cursor = conectar_banco().execute("SELECT id FROM tarefas WHERE estado = ?", (estado,))
+            return [task_id for (task_id,) in cursor if task_id in tarefas]
+        return [task_id for task_id, task in tarefas.items() if task.get("estado") == estado]
+
+# Função para renomear o estado de todas as tarefas de uma coluna
+def renomear_estado_tarefas(estado, novo_estado):
+    global _assinatura_registro
+    with _lock_tarefas:
+        ids = ids_tarefas_no_estado(estado)
+        if not ids:
+            return
+        if not modo_sqlite():
+            tarefas = obter_tarefas()
+            salvar_alteracoes_tarefas(alteradas={task_id: dict(tarefas[task_id], estado=novo_estado) for task_id in ids})
+            return
+        # As bases do merge vêm da memória, que ainda tem o estado antigo; a assinatura é
+        # atualizada logo após o commit para o UPDATE não parecer uma alteração externa
+        tarefas = obter_tarefas()
+        try:
+            with conectar_banco() as conexao:
+                conexao.execute("UPDATE tarefas SET estado = ? WHERE estado = ?", (novo_estado, estado))
+            _assinatura_registro = obter_assinatura_registro()
+            marcar_pendentes(alteradas=ids, anteriores=tarefas)
+            for task_id in ids:
+                task = dict(tarefas[task_id], estado=novo_estado)
+                tarefas[task_id] = Tarefa.de_dict(task) if obter_config("tarefas_compactas", True) else task
+            _ids_para_render.update(ids)
+            atualizar_indice_busca(ids)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Erro ao renomear estado no banco: {e}")
+
+# Função para aplicar várias alterações com uma única gravação
+@instrumentar("salvar_alteracoes_tarefas")
+def salvar_alteracoes_tarefas(alteradas=None, removidas=(), remoto=False):
+    with _lock_tarefas:
+        tarefas = obter_tarefas()
+        # Formato colunar: a descrição ainda não decodificada acompanha a tarefa alterada
+        materializar_descricoes(tarefas, (alteradas or {}).keys())
+        if not remoto:
+            marcar_pendentes(alteradas=(alteradas or {}).keys(), removidas=removidas, anteriores=tarefas)
+        registros = []
+        for task_id, task in (alteradas or {}).items():
+            anterior = tarefas.get(task_id)
+            if (anterior is not None and "descricao" in anterior and descricao_esta_mapeada(task_id, task)):
+                task = dict(task, descricao=anterior["descricao"])
+            if not remoto and anterior is not None and "rev" in anterior and "rev" not in task:
+                # Edições locais preservam a revisão da planilha em que se basearam
+                task = dict(task, rev=anterior["rev"])
+            registros.append(registro_diario(task_id, anterior, task))
+            tarefas[task_id] = Tarefa.de_dict(task) if obter_config("tarefas_compactas", True) else task
+        for task_id in removidas:
+            _descricoes_mapeadas["indice"].pop(task_id, None)
+            if tarefas.pop(task_id, None) is not None:
+                registros.append({"op": "excluir", "id": task_id})
+        _ids_para_render.update((alteradas or {}).keys())
+        _ids_para_render.update(removidas)
+        for task_id in list((alteradas or {}).keys()) + list(removidas):
+            _cache_descricoes.pop(task_id, None)
+        atualizar_indice_busca(list((alteradas or {}).keys()) + list(removidas))
+        if modo_sqlite():
+            aplicar_registros_sqlite(registros)
+        elif modo_diario():
+            anexar_diario(registros)
+        else:
+            salvar_tarefas(tarefas)
+
+# Índice invertido para a busca: termo normalizado -> ids das tarefas que o contêm.
+# É montado na primeira busca e, depois disso, atualizado só para as tarefas que as
+# gravações alteram; substituir ou recarregar o repositório o invalida
+_indice_busca = None
+_termos_por_tarefa = {}
+_vocabulario_busca = []  # Termos ordenados, para busca por prefixo com bisect
+_geracao_indice = 0  # Incrementada a cada invalidação
+_alteradas_na_indexacao = set()  # Gravações feitas enquanto o índice era montado
+_lock_indexacao = threading.Lock()
+
+_MARCAS_DIACRITICAS = re.compile(r"[\u0300-\u036f]")
+_PALAVRA = re.compile(r"\w+")
+_FILTRO_CAMPO = re.compile(r"(?:estado|prioridade|data):[\w-]*")
+_FILTRO_INTERVALO = re.compile(r"(data|prioridade)(<=|>=|<|>)([\w-]*)")
+_COMPARADORES = {"<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+                 ">": lambda a, b: a > b, ">=": lambda a, b: a >= b}
+
+def normalizar_texto(texto):
+    texto = str(texto).lower()
+    if texto.isascii():
+        return texto
+    return _MARCAS_DIACRITICAS.sub("", unicodedata.normalize("NFKD", texto))
+
+# A consulta é quebrada em palavras como o texto indexado (e-mail -> e, mail); só os filtros
+# "campo:valor" ficam inteiros, para casar com os termos de campo do índice
+def termos_busca(texto):
+    termos = []
+    for parte in normalizar_texto(texto).split():
+        filtro = _FILTRO_INTERVALO.match(parte) or _FILTRO_CAMPO.match(parte)
+        if filtro:
+            termos.append(filtro.group())
+        else:
+            termos.extend(_PALAVRA.findall(parte))
+    return termos
+
+# Filtros de intervalo (data>=2024-05-01, prioridade>=media) não usam o índice: comparam a data
+# e o nível de prioridade já interpretados da tarefa. Prioridade maior = mais urgente (alta > baixa).
+# Um valor ainda incompleto (enquanto se digita) não filtra nada
+def filtro_intervalo(termo):
+    encontrado = _FILTRO_INTERVALO.fullmatch(termo)
+    if not encontrado:
+        return None
+    campo, operador, valor = encontrado.groups()
+    if campo == "data":
+        limite = interpretar_data(valor)
+        limite = limite.date() if limite is not None else None
+    else:
+        niveis = {normalizar_texto(prioridade): nivel for prioridade, nivel in NIVEL_PRIORIDADE.items()}
+        limite = -niveis[valor] if valor in niveis else None
+    return campo, _COMPARADORES[operador], limite
+
+def atende_intervalos(task, intervalos):
+    for campo, comparar, limite in intervalos:
+        if limite is None:
+            continue
+        if campo == "data":
+            criado_em = task.criado_em if type(task) is Tarefa else interpretar_data(task.get("data_criacao"))
+            if criado_em is None or not comparar(criado_em.date(), limite):
+                return False
+        else:
+            nivel = (task.nivel_prioridade if type(task) is Tarefa else
+                     NIVEL_PRIORIDADE.get(task.get("prioridade", PRIORIDADE_PADRAO), NIVEL_PRIORIDADE[PRIORIDADE_PADRAO]))
+            if not comparar(-nivel, limite):
+                return False
+    return True
+
+def termos_da_tarefa(task_id, task):
+    campos = (task.get("titulo", ""), descricao_tarefa(task_id, task) or "", task.get("estado", ""),
+              task.get("prioridade", ""), task.get("data_criacao", ""))
+    termos = set(_PALAVRA.findall(normalizar_texto(" ".join(str(campo) for campo in campos))))
+    termos.add(normalizar_texto(task_id))
+    termos.update(_PALAVRA.findall(normalizar_texto(task_id)))  # Ids como "12-abcd" buscados por partes
+    # Filtros por campo: estado:done, prioridade:alta, data:2024-05-01
+    termos.add("estado:" + normalizar_texto(task.get("estado", "")).replace(" ", ""))
+    termos.add("prioridade:" + normalizar_texto(task.get("prioridade", "")))
+    termos.add("data:" + str(task.get("data_criacao", ""))[:10])
+    return frozenset(termos)
+
+def _indexar_tarefa(task_id, task):
+    anteriores = _termos_por_tarefa.pop(task_id, frozenset())
+    atuais = termos_da_tarefa(task_id, task) if task is not None else frozenset()
+    for termo in anteriores - atuais:
+        ids = _indice_busca.get(termo)
+        if ids is not None:
+            ids.discard(task_id)
+            if not ids:
+                del _indice_busca[termo]
+                posicao = bisect.bisect_left(_vocabulario_busca, termo)
+                if posicao < len(_vocabulario_busca) and _vocabulario_busca[posicao] == termo:
+                    del _vocabulario_busca[posicao]
+    for termo in atuais - anteriores:
+        ids = _indice_busca.get(termo)
+        if ids is None:
+            _indice_busca[termo] = ids = set()
+            bisect.insort(_vocabulario_busca, termo)
+        ids.add(task_id)
+    if atuais:
+        _termos_por_tarefa[task_id] = atuais
+
+# Função para montar o índice (primeira busca, ou em segundo plano ao focar a barra de busca).
+# A montagem roda fora de _lock_tarefas sobre uma cópia; as gravações feitas nesse meio tempo
+# são reindexadas ao final
+def garantir_indice_busca():
+    global _indice_busca, _vocabulario_busca, _termos_por_tarefa
+    with _lock_indexacao:
+        while True:
+            with _lock_tarefas:
+                if _indice_busca is not None:
+                    return
+                geracao = _geracao_indice
+                itens = list(obter_tarefas().items())
+                _alteradas_na_indexacao.clear()
+            inicio = time.perf_counter()
+            indice = {}
+            termos_por_tarefa = {}
+            for task_id, task in itens:
+                termos = termos_da_tarefa(task_id, task)
+                termos_por_tarefa[task_id] = termos
+                for termo in termos:
+                    ids = indice.get(termo)
+                    if ids is None:
+                        indice[termo] = ids = set()
+                    ids.add(task_id)
+            with _lock_tarefas:
+                if geracao != _geracao_indice:
+                    continue  # Repositório substituído durante a montagem: recomeçar
+                _termos_por_tarefa = termos_por_tarefa
+                _vocabulario_busca = sorted(indice)
+                _indice_busca = indice
+                for task_id in _alteradas_na_indexacao:
+                    _indexar_tarefa(task_id, (_tarefas_memoria or {}).get(task_id))
+                _alteradas_na_indexacao.clear()
+            registrar_tempo("indexar_busca", (time.perf_counter() - inicio) * 1000)
+            return
+
+def invalidar_indice_busca():
+    global _indice_busca, _geracao_indice
+    with _lock_tarefas:
+        _indice_busca = None
+        _geracao_indice += 1
+        _termos_por_tarefa.clear()
+
+# Função chamada pelas gravações: reindexa só as tarefas alteradas/removidas
+def atualizar_indice_busca(ids):
+    with _lock_tarefas:
+        if _indice_busca is None:
+            _alteradas_na_indexacao.update(ids)
+            return
+        tarefas = _tarefas_memoria or {}
+        for task_id in ids:
+            _indexar_tarefa(task_id, tarefas.get(task_id))
+
+def ids_do_termo(termo):
+    # Termos de 1 caractere só casam exatamente; os demais casam por prefixo (busca enquanto digita)
+    if len(termo) < 2:
+        return _indice_busca.get(termo, set())
+    encontrados = set()
+    posicao = bisect.bisect_left(_vocabulario_busca, termo)
+    while posicao < len(_vocabulario_busca) and _vocabulario_busca[posicao].startswith(termo):
+        encontrados |= _indice_busca[_vocabulario_busca[posicao]]
+        posicao += 1
+    return encontrados
+
+# Função para buscar os ids que contêm todos os termos
+@instrumentar("buscar_tarefas")
+def buscar_ids(termos):
+    garantir_indice_busca()
+    intervalos = [filtro for filtro in map(filtro_intervalo, termos) if filtro is not None]
+    termos = [termo for termo in termos if not _FILTRO_INTERVALO.fullmatch(termo)]
+    with _lock_tarefas:
+        resultado = None
+        # Termos mais longos costumam ser mais seletivos: começar por eles reduz as interseções
+        for termo in sorted(termos, key=len, reverse=True):
+            ids = ids_do_termo(termo)
+            resultado = set(ids) if resultado is None else resultado & ids
+            if not resultado:
+                break
+        if intervalos:
+            tarefas = _tarefas_memoria or {}
+            candidatos = tarefas if resultado is None else resultado
+            resultado = {task_id for task_id in candidatos
+                         if task_id in tarefas and atende_intervalos(tarefas[task_id], intervalos)}
+        return resultado if resultado is not None else set()
+
+# Função para testar uma tarefa isolada contra os termos (usada na reconciliação do quadro)
+def tarefa_corresponde(task_id, termos):
+    with _lock_tarefas:
+        proprios = _termos_por_tarefa.get(task_id, frozenset())
+        intervalos = [filtro for filtro in map(filtro_intervalo, termos) if filtro is not None]
+        if intervalos:
+            task = (_tarefas_memoria or {}).get(task_id)
+            if task is None or not atende_intervalos(task, intervalos):
+                return False
+        return all(termo in proprios if len(termo) < 2 else any(p.startswith(termo) for p in proprios)
+                   for termo in termos if not _FILTRO_INTERVALO.fullmatch(termo))
+
+# Função para criar ou substituir uma tarefa
+def definir_tarefa(task_id, task):
+    salvar_alteracoes_tarefas(alteradas={task_id: task})
+
+# Função para remover uma tarefa
+def remover_tarefa(task_id):
+    salvar_alteracoes_tarefas(removidas=[task_id])
+
+# Armazenamento em diário (append-only): cada mutação grava um registro compacto em
+# tasks.journal; o tasks.json vira um snapshot, reescrito apenas na compactação
+_registros_diario = 0
+
+def modo_diario():
+    # O formato colunar também registra as edições no diário; só o snapshot muda de formato
+    return obter_config("armazenamento", "json") in ("diario", "colunar")
+
+# Função para montar o registro de diário de uma mutação
+def registro_diario(task_id, anterior, task):
+    if anterior is None:
+        return {"op": "criar", "id": task_id, "task": task}
+    diferencas = {chave for chave in set(anterior) | set(task) if anterior.get(chave) != task.get(chave)}
+    if diferencas == {"estado"}:
+        return {"op": "mover", "id": task_id, "estado": task["estado"]}
+    return {"op": "atualizar", "id": task_id, "task": task}
+
+# Função para anexar registros ao diário (custo proporcional à alteração, não ao quadro)
+def anexar_diario(registros):
+    global _assinatura_registro, _registros_diario
+    if not registros:
+        return
+    diario_path = os.path.join(DATA_DIR, DIARIO_TAREFAS)
+    try:
+        with _lock_tarefas:
+            with open(diario_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False, default=serializar_tarefa) + "\n"
+                                for r in registros))
+            _registros_diario += len(registros)
+            _assinatura_registro = obter_assinatura_registro()
+            if _registros_diario >= obter_config("diario_compactar_apos", 1000):
+                compactar_diario()
+    except Exception as e:
+        print(f"[ERROR] Erro ao gravar diário de tarefas: {e}")
+
+# Função para descartar um último registro incompleto (queda no meio de uma gravação): sem o
+# "\n" final, o próximo registro anexado seria colado nele e os dois se perderiam na leitura
+def cortar_registro_truncado(caminho):
+    with open(caminho, "r+b") as f:
+        tamanho = f.seek(0, os.SEEK_END)
+        if tamanho == 0:
+            return
+        f.seek(tamanho - 1)
+        if f.read(1) == b"\n":
+            return
+        # Volta em blocos até o último "\n" completo
+        fim = tamanho
+        while fim > 0:
+            inicio = max(0, fim - 65536)
+            f.seek(inicio)
+            posicao = f.read(fim - inicio).rfind(b"\n")
+            if posicao >= 0:
+                fim = inicio + posicao + 1
+                break
+            fim = inicio
+        print(f"[WARNING] Registro incompleto no fim de {os.path.basename(caminho)} descartado "
+              f"({tamanho - fim} bytes).")
+        f.truncate(fim)
+        f.flush()
+        os.fsync(f.fileno())
+
+# Função para reaplicar o diário sobre o snapshot carregado
+def reproduzir_diario(tarefas):
+    global _registros_diario
+    diario_path = os.path.join(DATA_DIR, DIARIO_TAREFAS)
+    _registros_diario = 0
+    if not os.path.exists(diario_path):
+        return tarefas
+    cortar_registro_truncado(diario_path)
+    with open(diario_path, "r", encoding="utf-8") as f:
+        for numero, linha in enumerate(f, 1):
+            try:
+                registro = json.loads(linha)
+                op, task_id = registro["op"], registro["id"]
+                if op in ("criar", "atualizar"):
+                    tarefas[task_id] = registro["task"]
+                elif op == "mover" and task_id in tarefas:
+                    tarefas[task_id] = dict(tarefas[task_id], estado=registro["estado"])
+                elif op == "excluir":
+                    tarefas.pop(task_id, None)
+                _registros_diario += 1
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                print(f"[WARNING] Registro {numero} do diário ignorado: {e}")
+    print(f"[INFO] {_registros_diario} registro(s) do diário reaplicados.")
+    return tarefas
+
+# Função para compactar o diário em um novo snapshot
+def compactar_diario():
+    with _lock_tarefas:
+        print(f"[INFO] Compactando diário ({_registros_diario} registros).")
+        salvar_tarefas(obter_tarefas())
+
+# Formato colunar opcional ("armazenamento": "colunar"): snapshot binário com um bloco por campo.
+#   b"TKCOL1\n" | tamanho do cabeçalho (uint32) | cabeçalho JSON | blocos
+# Campos de texto (id, titulo, data_criacao, descricao, extras) são um vetor de deslocamentos
+# uint64 seguido dos bytes UTF-8 concatenados; estado e prioridade são índices uint16 em tabelas
+# de valores únicos (internados). O arquivo é mapeado em memória e as descrições só são
+# decodificadas quando alguém as lê (obter_tarefa / descricao_tarefa)
+ASSINATURA_COLUNAR = b"TKCOL1\n"
+CAMPOS_COLUNARES_TEXTO = ("titulo", "data_criacao")
+CAMPOS_COLUNARES_INTERNADOS = ("estado", "prioridade")
+SEM_VALOR = 0xFFFF
+_descricoes_mapeadas = {"mapa": None, "offsets": None, "presente": b"", "inicio": 0, "indice": {}}
+
+def modo_colunar():
+    return obter_config("armazenamento", "json") == "colunar"
+
+def descricao_mapeada(task_id):
+    if modo_sqlite():
+        # No modo SQLite o "mapeamento" são as linhas do banco com descrição (ver carregar_tarefas_sqlite)
+        linha = conectar_banco().execute("SELECT descricao FROM tarefas WHERE id = ?", (task_id,)).fetchone()
+        return linha[0] if linha else None
+    origem = _descricoes_mapeadas
+    i = origem["indice"][task_id]
+    offsets = origem["offsets"]
+    if not origem["presente"][i]:
+        return None
+    return origem["mapa"][origem["inicio"] + offsets[i]:origem["inicio"] + offsets[i + 1] - 1].decode("utf-8")
+
+# Uma tarefa com "descricao_hash" recebeu da planilha uma descrição que ainda não foi baixada:
+# o que estiver mapeado para ela é a versão antiga e não vale mais
+def descricao_esta_mapeada(task_id, task):
+    return "descricao" not in task and "descricao_hash" not in task and task_id in _descricoes_mapeadas["indice"]
+
+# Função para ler a descrição de uma tarefa sem guardá-la no repositório (ex.: índice de busca)
+def descricao_tarefa(task_id, task):
+    if "descricao" in task:
+        return task["descricao"]
+    with _lock_tarefas:
+        if descricao_esta_mapeada(task_id, task):
+            return descricao_mapeada(task_id)
+    return None
+
+# Função para materializar as descrições ainda mapeadas (ex.: antes de um envio completo)
+def materializar_descricoes(tarefas, ids=None):
+    with _lock_tarefas:
+        for task_id in (tarefas if ids is None else ids):
+            task = tarefas.get(task_id)
+            if task is not None and descricao_esta_mapeada(task_id, task):
+                descricao = descricao_mapeada(task_id)
+                if descricao is not None:
+                    task["descricao"] = descricao
+
+def _bloco_texto(valores):
+    # Cada valor termina em NUL: sem NUL nos textos, a leitura decodifica o bloco inteiro e divide
+    offsets = array("Q", [0])
+    partes = []
+    total = 0
+    for valor in valores:
+        total += len(valor) + 1
+        partes.append(valor)
+        offsets.append(total)
+    partes.append(b"")
+    return offsets.tobytes() + b"\0".join(partes)
+
+def salvar_tarefas_colunar(caminho, tarefas):
+    ids = list(tarefas)
+    tabelas = {campo: {} for campo in CAMPOS_COLUNARES_INTERNADOS}
+    indices = {campo: array("H") for campo in CAMPOS_COLUNARES_INTERNADOS}
+    textos = {campo: [] for campo in CAMPOS_COLUNARES_TEXTO}
+    extras = []
+    descricoes = []
+    presenca_descricao = array("B")
+    origem = _descricoes_mapeadas
+    for task_id in ids:
+        task = tarefas[task_id]
+        resto = {}
+        ausentes = []
+        for campo in CAMPOS_COLUNARES_INTERNADOS:
+            valor = task.get(campo)
+            if isinstance(valor, str):
+                indices[campo].append(tabelas[campo].setdefault(valor, len(tabelas[campo])))
+            else:
+                indices[campo].append(SEM_VALOR)
+                if campo in task:
+                    resto[campo] = valor
+        for campo in CAMPOS_COLUNARES_TEXTO:
+            valor = task.get(campo)
+            textos[campo].append(valor.encode("utf-8") if isinstance(valor, str) else b"")
+            if not isinstance(valor, str):
+                if campo in task:
+                    resto[campo] = valor
+                else:
+                    ausentes.append(campo)
+        if "descricao" in task:
+            valor = task["descricao"]
+            descricoes.append(valor.encode("utf-8") if isinstance(valor, str) else b"")
+            presenca_descricao.append(1 if isinstance(valor, str) else 0)
+            if not isinstance(valor, str):
+                resto["descricao"] = valor
+        elif descricao_esta_mapeada(task_id, task):
+            # Copia os bytes da descrição ainda não decodificada direto do arquivo anterior
+            i = origem["indice"][task_id]
+            ini, fim = origem["offsets"][i], origem["offsets"][i + 1] - 1
+            descricoes.append(origem["mapa"][origem["inicio"] + ini:origem["inicio"] + fim])
+            presenca_descricao.append(origem["presente"][i])
+        else:
+            descricoes.append(b"")
+            presenca_descricao.append(0)
+        resto.update({chave: valor for chave, valor in task.items()
+                      if chave not in CAMPOS_COLUNARES_TEXTO + CAMPOS_COLUNARES_INTERNADOS + ("descricao",)})
+        if ausentes:
+            resto["_ausentes"] = ausentes
+        extras.append(json.dumps(resto, ensure_ascii=False, separators=(",", ":")).encode("utf-8") if resto else b"")
+
+    blocos = [("id", _bloco_texto(task_id.encode("utf-8") for task_id in ids))]
+    blocos += [(campo, _bloco_texto(textos[campo])) for campo in CAMPOS_COLUNARES_TEXTO]
+    blocos += [(campo, indices[campo].tobytes()) for campo in CAMPOS_COLUNARES_INTERNADOS]
+    blocos += [("extras", _bloco_texto(extras)), ("descricao_presente", presenca_descricao.tobytes()),
+               ("descricao", _bloco_texto(descricoes))]
+    cabecalho = {"n": len(ids), "tabelas": {campo: list(tabelas[campo]) for campo in CAMPOS_COLUNARES_INTERNADOS},
+                 "blocos": {}}
+    posicao = 0
+    for nome, bloco in blocos:
+        cabecalho["blocos"][nome] = [posicao, len(bloco)]
+        posicao += len(bloco)
+    cabecalho_bytes = json.dumps(cabecalho, ensure_ascii=False).encode("utf-8")
+
+    def escrever(f):
+        f.write(ASSINATURA_COLUNAR + struct.pack("<I", len(cabecalho_bytes)) + cabecalho_bytes)
+        for _, bloco in blocos:
+            f.write(bloco)
+        # Os bytes necessários já foram copiados; o mapeamento anterior é fechado antes da
+        # renomeação (no Windows um arquivo mapeado não pode ser substituído)
+        fechar_descricoes_mapeadas()
+    try:
+        gravar_arquivo_atomico(caminho, escrever, binario=True)
+    except OSError:
+        # O arquivo anterior continua no lugar: sem voltar a mapeá-lo, as descrições ainda não
+        # decodificadas seriam lidas (e, na próxima gravação, salvas) como ausentes
+        if _descricoes_mapeadas["mapa"] is None and os.path.exists(caminho):
+            mapear_descricoes(caminho)
+        raise
+    # As tarefas que continuam sem descrição decodificada passam a apontar para o novo arquivo
+    if caminho == os.path.join(DATA_DIR, COLUNAR_TAREFAS):
+        mapear_descricoes(caminho)
+
+def fechar_descricoes_mapeadas():
+    if _descricoes_mapeadas["mapa"] is not None:
+        _descricoes_mapeadas["mapa"].close()
+    _descricoes_mapeadas.update(mapa=None, offsets=None, presente=b"", inicio=0, indice={})
+
+def _ler_cabecalho_colunar(mapa):
+    if mapa[:len(ASSINATURA_COLUNAR)] != ASSINATURA_COLUNAR:
+        raise ValueError("arquivo colunar com assinatura inválida")
+    inicio = len(ASSINATURA_COLUNAR)
+    (tamanho,) = struct.unpack("<I", mapa[inicio:inicio + 4])
+    cabecalho = json.loads(mapa[inicio + 4:inicio + 4 + tamanho].decode("utf-8"))
+    return cabecalho, inicio + 4 + tamanho
+
+def _ler_textos(mapa, base, bloco, n):
+    posicao, _ = bloco
+    offsets = array("Q")
+    offsets.frombytes(mapa[base + posicao:base + posicao + 8 * (n + 1)])
+    dados = mapa[base + posicao + 8 * (n + 1):base + posicao + 8 * (n + 1) + offsets[n]]
+    if dados.count(b"\0") == n:
+        return dados.decode("utf-8").split("\0")[:n]
+    return [dados[offsets[i]:offsets[i + 1] - 1].decode("utf-8") for i in range(n)]
+
+def _mapear(caminho):
+    with open(caminho, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("arquivo colunar vazio")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+# Função para (re)mapear o bloco de descrições do tasks.col atual
+def mapear_descricoes(caminho):
+    mapa = _mapear(caminho)
+    cabecalho, base = _ler_cabecalho_colunar(mapa)
+    n = cabecalho["n"]
+    ids = _ler_textos(mapa, base, cabecalho["blocos"]["id"], n)
+    posicao, _ = cabecalho["blocos"]["descricao"]
+    offsets = array("Q")
+    offsets.frombytes(mapa[base + posicao:base + posicao + 8 * (n + 1)])
+    inicio_presente = base + cabecalho["blocos"]["descricao_presente"][0]
+    _descricoes_mapeadas.update(mapa=mapa, offsets=offsets, presente=mapa[inicio_presente:inicio_presente + n],
+                                inicio=base + posicao + 8 * (n + 1),
+                                indice={task_id: i for i, task_id in enumerate(ids)})
+
+@instrumentar("carregar_tarefas_colunar")
+def carregar_tarefas_colunar(caminho, descricoes_preguicosas=True):
+    mapa = _mapear(caminho)
+    try:
+        cabecalho, base = _ler_cabecalho_colunar(mapa)
+        n = cabecalho["n"]
+        blocos = cabecalho["blocos"]
+        ids = _ler_textos(mapa, base, blocos["id"], n)
+        colunas_texto = [(campo, _ler_textos(mapa, base, blocos[campo], n)) for campo in CAMPOS_COLUNARES_TEXTO]
+        colunas_internadas = []
+        for campo in CAMPOS_COLUNARES_INTERNADOS:
+            indices = array("H")
+            posicao, tamanho = blocos[campo]
+            indices.frombytes(mapa[base + posicao:base + posicao + tamanho])
+            valores = [sys.intern(valor) for valor in cabecalho["tabelas"][campo]]
+            colunas_internadas.append((campo, indices, valores))
+        extras = _ler_textos(mapa, base, blocos["extras"], n)
+        inicio_presente = base + blocos["descricao_presente"][0]
+        presente = mapa[inicio_presente:inicio_presente + n]
+        descricoes = None if descricoes_preguicosas else _ler_textos(mapa, base, blocos["descricao"], n)
+    finally:
+        mapa.close()
+
+    tarefas = {}
+    for i, task_id in enumerate(ids):
+        task = {campo: valores[i] for campo, valores in colunas_texto}
+        for campo, indices, valores in colunas_internadas:
+            if indices[i] != SEM_VALOR:
+                task[campo] = valores[indices[i]]
+        if extras[i]:
+            resto = json.loads(extras[i])
+            for campo in resto.pop("_ausentes", ()):
+                task.pop(campo, None)
+            task.update(resto)
+        if descricoes is not None and presente[i]:
+            task["descricao"] = descricoes[i]
+        tarefas[task_id] = task
+    if descricoes_preguicosas:
+        fechar_descricoes_mapeadas()
+        mapear_descricoes(caminho)
+    return tarefas
+
+# Descrições sob demanda: cartões, colunas e busca usam só os campos de resumo; a descrição
+# é lida (do arquivo colunar mapeado ou, se só a planilha a tem, do Apps Script) quando os
+# detalhes ou o editor a pedem, e as últimas lidas ficam num cache LRU pequeno
+TAMANHO_CACHE_DESCRICOES = 64
+_cache_descricoes = OrderedDict()
+
+def hash_descricao(texto):
+    # Mesmo cálculo do Apps Script (hashDescricao): MD5 do UTF-8, 12 primeiros dígitos hex
+    return hashlib.md5(str(texto).encode("utf-8")).hexdigest()[:12]
+
+# Função para obter a descrição de uma tarefa; None se ela não tem descrição ou se
+# só a planilha a tem e buscar_remota=False (ou a busca falhou)
+def obter_descricao(task_id, buscar_remota=True):
+    with _lock_tarefas:
+        if task_id in _cache_descricoes:
+            _cache_descricoes.move_to_end(task_id)
+            return _cache_descricoes[task_id]
+        task = obter_tarefas().get(task_id)
+        if task is None:
+            return None
+        descricao = descricao_tarefa(task_id, task)
+        pendente_remota = descricao is None and "descricao_hash" in task
+    if pendente_remota:
+        if not buscar_remota:
+            return None
+        descricao = buscar_descricoes_planilha([task_id]).get(task_id)
+        if descricao is None:
+            return None
+        with _lock_tarefas:
+            task = obter_tarefas().get(task_id)
+            if task is None or "descricao_hash" not in task:
+                return descricao  # Alterada enquanto a descrição era baixada
+            # Guardada no repositório para continuar disponível sem rede
+            recebida = dict(task, descricao=descricao)
+            recebida.pop("descricao_hash")
+            salvar_alteracoes_tarefas(alteradas={task_id: recebida}, remoto=True)
+    if descricao is not None:
+        with _lock_tarefas:
+            _cache_descricoes[task_id] = descricao
+            while len(_cache_descricoes) > TAMANHO_CACHE_DESCRICOES:
+                _cache_descricoes.popitem(last=False)
+    return descricao
+
+# Função para saber se a descrição de uma tarefa precisa ser baixada da planilha
+def descricao_remota_pendente(task_id):
+    task = obter_tarefa(task_id)
+    return task is not None and "descricao_hash" in task and task_id not in _cache_descricoes
+
+# Armazenamento SQLite opcional ("armazenamento": "sqlite"), com índices por estado,
+# prioridade e data de criação; o tasks.json existente é migrado na primeira execução.
+# As descrições ficam no banco e são lidas por id quando pedidas, como no formato colunar
+CAMPOS_TAREFA = ("titulo", "descricao", "estado", "prioridade", "data_criacao")
+_conexao_banco = None
+
+def modo_sqlite():
+    return obter_config("armazenamento", "json") == "sqlite"
+
+# Função para abrir (uma única vez) a conexão com o banco de tarefas
+def conectar_banco():
+    global _conexao_banco
+    if _conexao_banco is None:
+        # O acesso é serializado por _lock_tarefas, então a conexão pode ser usada pela thread de sincronização
+        _conexao_banco = sqlite3.connect(os.path.join(DATA_DIR, BANCO_TAREFAS), check_same_thread=False)
+        _conexao_banco.executescript("""
+            CREATE TABLE IF NOT EXISTS tarefas (
+                id TEXT PRIMARY KEY,
+                titulo TEXT,
+                descricao TEXT,
+                estado TEXT,
+                prioridade TEXT,
+                data_criacao TEXT,
+                extras TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_tarefas_estado ON tarefas (estado);
+            CREATE INDEX IF NOT EXISTS idx_tarefas_prioridade ON tarefas (prioridade);
+            CREATE INDEX IF NOT EXISTS idx_tarefas_data_criacao ON tarefas (data_criacao);
+        """)
+    return _conexao_banco
+
+# Funções de conversão entre o dicionário da tarefa e a linha da tabela
+def tarefa_para_linha(task_id, task):
+    extras = {chave: valor for chave, valor in task.items() if chave not in CAMPOS_TAREFA}
+    return (task_id, *(task.get(campo) for campo in CAMPOS_TAREFA),
+            json.dumps(extras, ensure_ascii=False) if extras else None)
+
+def linha_para_tarefa(linha):
+    task = {campo: valor for campo, valor in zip(CAMPOS_TAREFA, linha[1:6]) if valor is not None}
+    if linha[6]:
+        task.update(json.loads(linha[6]))
+    return task
+
+# Função para carregar tarefas do banco, migrando o tasks.json na primeira vez
+def carregar_tarefas_sqlite():
+    banco_existia = os.path.exists(os.path.join(DATA_DIR, BANCO_TAREFAS))
+    try:
+        conexao = conectar_banco()
+        if not banco_existia:
+            migrar_json_para_sqlite()
+        tarefas = {}
+        com_descricao = []
+        consulta = "SELECT id, titulo, NULL, estado, prioridade, data_criacao, extras, descricao IS NOT NULL FROM tarefas"
+        for linha in conexao.execute(consulta):
+            tarefas[linha[0]] = linha_para_tarefa(linha)
+            if linha[7]:
+                com_descricao.append(linha[0])
+        fechar_descricoes_mapeadas()
+        _descricoes_mapeadas["indice"] = dict.fromkeys(com_descricao)
+        print(f"[INFO] {len(tarefas)} tarefas carregadas do banco {BANCO_TAREFAS}")
+        return tarefas
+    except sqlite3.Error as e:
+        print(f"[ERROR] Erro ao carregar tarefas do banco: {e}")
         return {}
 
+# Função para migrar (uma única vez) o tasks.json e o diário para o banco
+def migrar_json_para_sqlite():
+    registro_path = os.path.join(DATA_DIR, REGISTRO_TAREFAS)
+    tarefas = {}
+    try:
+        if os.path.exists(registro_path):
+            with open(registro_path, "r", encoding="utf-8") as f:
+                tarefas = json.load(f)
+            tarefas = reproduzir_diario(tarefas)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"[WARNING] tasks.json não pôde ser migrado: {e}")
+        return
+    salvar_tarefas_sqlite(tarefas)
+    print(f"[INFO] {len(tarefas)} tarefas migradas de {REGISTRO_TAREFAS} para {BANCO_TAREFAS}")
+
+# Função para substituir todo o conteúdo do banco (usada pela sincronização completa)
+def salvar_tarefas_sqlite(tarefas):
+    with conectar_banco() as conexao:
+        # Descrições que ainda não foram lidas do banco são copiadas para as linhas novas
+        # sem passar a ocupar memória nas tarefas
+        guardadas = dict(conexao.execute("SELECT id, descricao FROM tarefas WHERE descricao IS NOT NULL"))
+        linhas = []
+        for task_id, task in tarefas.items():
+            linha = tarefa_para_linha(task_id, task)
+            if descricao_esta_mapeada(task_id, task):
+                linha = linha[:2] + (guardadas.get(task_id),) + linha[3:]
+            linhas.append(linha)
+        conexao.execute("DELETE FROM tarefas")
+        conexao.executemany("INSERT INTO tarefas VALUES (?, ?, ?, ?, ?, ?, ?)", linhas)
+    log_evento("INFO", "tarefas.salvas", arquivo=BANCO_TAREFAS, total=len(tarefas))
+
+# Função para gravar no banco apenas as linhas alteradas
+def aplicar_registros_sqlite(registros):
+    global _assinatura_registro
+    if not registros:
+        return
+    tarefas = obter_tarefas()
+    try:
+        with conectar_banco() as conexao:
+            for registro in registros:
+                if registro["op"] == "excluir":
+                    conexao.execute("DELETE FROM tarefas WHERE id = ?", (registro["id"],))
+                elif registro["op"] == "mover":
+                    conexao.execute("UPDATE tarefas SET estado = ? WHERE id = ?", (registro["estado"], registro["id"]))
+                else:
+                    conexao.execute("INSERT OR REPLACE INTO tarefas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                    tarefa_para_linha(registro["id"], tarefas[registro["id"]]))
+        _assinatura_registro = obter_assinatura_registro()
+    except sqlite3.Error as e:
+        print(f"[ERROR] Erro ao gravar tarefas no banco: {e}")
+
 # Função para alterar a URL do Google Sheets
 def alterar_url():
     global GOOGLE_SHEETS_URL, GOOGLE_SHEETS_API_URL
@@ -269,94 +1407,721 @@ def adicionar_estado():
         salvar_configuracoes(GOOGLE_SHEETS_URL, estados, CORES_COLUNAS)
         reordenar_colunas()
         atualizar_tarefas()
-        enviar_tarefas_planilha()  # Sincronizar estados com a planilha
+        agendar_envio()  # Sincronizar estados com a planilha
         messagebox.showinfo("Estado Adicionado", f"Estado '{novo_estado}' adicionado com cor {cor_escolhida}.")
     elif novo_estado in estados:
         messagebox.showwarning("Estado Existente", "Este estado já existe.")
 
+# Estado da sincronização incremental: versão da planilha conhecida e ids alterados
+# localmente desde o último envio aceito pelo Apps Script. Cada pendência guarda um
+# número de sequência (para não descartar uma edição feita durante o envio) e a versão
+# da tarefa antes da edição local, usada como base da mesclagem em três vias
+versao_planilha = None
+_pendentes_alteradas = {}
+_pendentes_removidas = {}
+_bases_pendentes = {}
+_sequencia_pendencias = 0
+_lock_sincronizacao = threading.Lock()
+CAMPOS_MESCLAVEIS = ("titulo", "descricao", "estado", "prioridade")
+
+# Função para carregar a versão da planilha registrada no último envio/recebimento
+def carregar_estado_sincronizacao():
+    global versao_planilha, _cliente_id, _proximo_id, _servidor_descricoes_sob_demanda
+    try:
+        with open(os.path.join(DATA_DIR, ESTADO_SINCRONIZACAO), "r", encoding="utf-8") as f:
+            estado = json.load(f)
+        versao_planilha = estado.get("versao")
+        _cliente_id = estado.get("cliente") or _cliente_id
+        _proximo_id = max(_proximo_id, int(estado.get("proximo_id", 1)))
+        _servidor_descricoes_sob_demanda = bool(estado.get("descricoes_sob_demanda", False))
+    except (OSError, json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        versao_planilha = None
+
+# Função para salvar a versão da planilha (e o alocador de ids)
+def salvar_estado_sincronizacao():
+    try:
+        with _lock_ids:
+            estado = {"versao": versao_planilha, "cliente": _cliente_id, "proximo_id": _proximo_id,
+                      "descricoes_sob_demanda": _servidor_descricoes_sob_demanda}
+        gravar_json_atomico(os.path.join(DATA_DIR, ESTADO_SINCRONIZACAO), estado)
+    except Exception as e:
+        print(f"[ERROR] Erro ao salvar estado da sincronização: {e}")
+
+# Alocador de ids: contador local persistido em sync.json + identificador aleatório do cliente
+# ("42-kqzxmbtrea"). Não consulta as tarefas existentes, não repete ids após exclusões e não
+# colide entre clientes da mesma planilha: todos os contadores começam em 1, então o sufixo
+# (26^10 valores, de uma fonte do sistema) é o que os separa. Os ids numéricos antigos
+# ("1", "2", ...) nunca têm sufixo. O sufixo só tem letras para a planilha não interpretar o id
+# como data ou número; sufixos curtos de versões anteriores são trocados no próximo id criado
+TAMANHO_SUFIXO_CLIENTE = 10
+_cliente_id = None
+_proximo_id = 1
+_lock_ids = threading.Lock()
+
+def novo_id_tarefa():
+    global _cliente_id, _proximo_id
+    with _lock_ids:
+        if _cliente_id is None or len(_cliente_id) < TAMANHO_SUFIXO_CLIENTE:
+            _cliente_id = "".join(secrets.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(TAMANHO_SUFIXO_CLIENTE))
+        task_id = f"{_proximo_id}-{_cliente_id}"
+        _proximo_id += 1
+    # Persistido antes de a tarefa ser gravada: um id nunca é reutilizado, mesmo após uma queda
+    salvar_estado_sincronizacao()
+    return task_id
+
+# Função para registrar ids que precisam ser enviados no próximo delta
+# Sem URL do Apps Script não há para onde enviar: o primeiro envio depois de configurá-la é
+# completo (versao_planilha ainda é None), então nada é enfileirado
+def marcar_pendentes(alteradas=(), removidas=(), anteriores=None):
+    global _sequencia_pendencias
+    if not GOOGLE_SHEETS_API_URL:
+        return
+    with _lock_sincronizacao:
+        registros = []
+        for tipo, ids in (("alterada", alteradas), ("removida", removidas)):
+            for task_id in ids:
+                registro = {"op": tipo, "id": task_id}
+                if task_id not in _bases_pendentes and anteriores is not None:
+                    registro["base"] = anteriores.get(task_id)
+                _sequencia_pendencias += 1
+                registro["seq"] = _sequencia_pendencias
+                registros.append(registro)
+                aplicar_registro_fila(registro)
+        anexar_fila_saida(registros)
+    notificar_fila_saida()
+
+# Função para descartar pendências já confirmadas pela planilha (se não foram editadas de novo)
+def limpar_pendentes(alteradas, removidas):
+    with _lock_sincronizacao:
+        registros = []
+        for pendentes, enviadas in ((_pendentes_alteradas, alteradas), (_pendentes_removidas, removidas)):
+            for task_id, sequencia in enviadas.items():
+                if task_id in pendentes and pendentes[task_id] == sequencia:
+                    registros.append({"op": "enviada", "id": task_id})
+                    aplicar_registro_fila(registros[-1])
+        anexar_fila_saida(registros)
+    notificar_fila_saida()
+
+# Fila de saída persistente: cada mudança nas pendências acima vira um registro compacto
+# anexado a outbox.jsonl (custo proporcional à mudança, não à fila). Edições feitas sem rede
+# sobrevivem a um reinício, continuam protegidas na mesclagem com a planilha e são enviadas,
+# na ordem em que foram feitas, pelo trabalhador de envio, que recua exponencialmente
+# enquanto a planilha não responde. O arquivo é esvaziado quando a fila é drenada e
+# reescrito só com o estado atual na inicialização ou quando os registros passam de
+# "fila_compactar_apos" (e do dobro das pendências, para a reescrita ficar amortizada)
+_registros_fila = 0
+
+# Função para aplicar um registro da fila às pendências (chamada com _lock_sincronizacao)
+def aplicar_registro_fila(registro):
+    op, task_id = registro["op"], registro["id"]
+    if op in ("alterada", "removida"):
+        if "base" in registro:
+            _bases_pendentes.setdefault(task_id, registro["base"])
+        origem, destino = ((_pendentes_removidas, _pendentes_alteradas) if op == "alterada"
+                           else (_pendentes_alteradas, _pendentes_removidas))
+        origem.pop(task_id, None)
+        destino[task_id] = registro["seq"]
+    elif op == "base":
+        _bases_pendentes[task_id] = registro["base"]
+    elif op == "enviada":
+        _pendentes_alteradas.pop(task_id, None)
+        _pendentes_removidas.pop(task_id, None)
+        _bases_pendentes.pop(task_id, None)
+    elif op == "descartada":
+        _pendentes_removidas.pop(task_id, None)
+        _bases_pendentes.pop(task_id, None)
+
+# Função para anexar registros à fila (chamada com _lock_sincronizacao, para manter a ordem)
+def anexar_fila_saida(registros):
+    global _registros_fila
+    if not registros:
+        return
+    fila_path = os.path.join(DATA_DIR, FILA_SAIDA)
+    try:
+        if not _pendentes_alteradas and not _pendentes_removidas:
+            # Fila drenada: nada a guardar
+            if _registros_fila:
+                open(fila_path, "w", encoding="utf-8").close()
+            _registros_fila = 0
+        elif _registros_fila + len(registros) > max(obter_config("fila_compactar_apos", 5000),
+                                                    2 * (len(_pendentes_alteradas) + len(_pendentes_removidas))):
+            compactar_fila_saida()
+        else:
+            with open(fila_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False, default=serializar_tarefa) + "\n"
+                                for r in registros))
+            _registros_fila += len(registros)
+    except Exception as e:
+        print(f"[ERROR] Erro ao gravar fila de envio: {e}")
+
+# Função para reescrever a fila só com as pendências atuais (chamada com _lock_sincronizacao)
+def compactar_fila_saida():
+    global _registros_fila
+    registros = []
+    for tipo, pendentes in (("alterada", _pendentes_alteradas), ("removida", _pendentes_removidas)):
+        for task_id, sequencia in pendentes.items():
+            registro = {"op": tipo, "id": task_id, "seq": sequencia}
+            if task_id in _bases_pendentes:
+                registro["base"] = _bases_pendentes[task_id]
+            registros.append(registro)
+    registros.sort(key=lambda r: r["seq"])
+    gravar_arquivo_atomico(os.path.join(DATA_DIR, FILA_SAIDA), lambda f: f.write("".join(
+        json.dumps(r, separators=(",", ":"), ensure_ascii=False, default=serializar_tarefa) + "\n" for r in registros)))
+    _registros_fila = len(registros)
+
+# Função para recuperar, na inicialização, as alterações que não chegaram a ser enviadas
+def carregar_fila_saida():
+    global _sequencia_pendencias
+    fila_path = os.path.join(DATA_DIR, FILA_SAIDA)
+    if not os.path.exists(fila_path):
+        return
+    try:
+        cortar_registro_truncado(fila_path)
+        with _lock_sincronizacao:
+            with open(fila_path, "r", encoding="utf-8") as f:
+                for numero, linha in enumerate(f, 1):
+                    try:
+                        registro = json.loads(linha)
+                        aplicar_registro_fila(registro)
+                        _sequencia_pendencias = max(_sequencia_pendencias, int(registro.get("seq", 0)))
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError) as e:
+                        print(f"[WARNING] Registro {numero} da fila de envio ignorado: {e}")
+            restantes = len(_pendentes_alteradas) + len(_pendentes_removidas)
+            compactar_fila_saida()
+    except OSError as e:
+        print(f"[ERROR] Erro ao ler fila de envio: {e}")
+        return
+    if restantes:
+        print(f"[INFO] {restantes} alteração(ões) da sessão anterior aguardando envio.")
+    notificar_fila_saida()
+
+def tamanho_fila_saida():
+    with _lock_sincronizacao:
+        return len(_pendentes_alteradas) + len(_pendentes_removidas)
+
+# Função para mesclar campo a campo (base/local/remota); retorna a tarefa e os campos em conflito
+def mesclar_tarefa(base, local, remota):
+    base = base or {}
+    mesclada = dict(remota)
+    conflitos = []
+    for campo in CAMPOS_MESCLAVEIS:
+        valor_base, valor_local, valor_remoto = base.get(campo), local.get(campo), remota.get(campo)
+        if valor_local == valor_remoto or valor_local == valor_base:
+            mesclada[campo] = valor_remoto
+        elif valor_remoto == valor_base:
+            mesclada[campo] = valor_local
+        else:
+            # Os dois lados mudaram o mesmo campo: prevalece a edição local, que será enviada
+            mesclada[campo] = valor_local
+            conflitos.append(campo)
+        if mesclada.get(campo) is None:
+            mesclada.pop(campo, None)
+    return mesclada, conflitos
+
+# Função para reconciliar tarefas recebidas da planilha com as pendências locais
+# Retorna (alteradas, removidas, avisos) prontas para salvar_alteracoes_tarefas(remoto=True)
+def reconciliar_remotas(tarefas_remotas, removidas_remotas):
+    locais = obter_tarefas()
+    materializar_descricoes(locais, tarefas_remotas)
+    alteradas, removidas, avisos = {}, [], []
+    with _lock_sincronizacao:
+        registros = []
+        for task_id, remota in tarefas_remotas.items():
+            if task_id in _pendentes_removidas:
+                continue  # A exclusão local prevalece e segue no próximo delta
+            if task_id in _pendentes_alteradas and task_id in locais:
+                mesclada, conflitos = mesclar_tarefa(_bases_pendentes.get(task_id), locais[task_id], remota)
+                # A remota já foi incorporada: passa a ser a base da próxima mesclagem
+                registros.append({"op": "base", "id": task_id, "base": remota})
+                aplicar_registro_fila(registros[-1])
+                alteradas[task_id] = mesclada
+                if conflitos:
+                    avisos.append(f"Conflito na tarefa {task_id} ({', '.join(conflitos)}): mantida a edição local.")
+            else:
+                alteradas[task_id] = remota
+        for task_id in removidas_remotas:
+            if task_id in _pendentes_alteradas:
+                avisos.append(f"Tarefa {task_id} foi excluída na planilha, mas editada aqui: mantida.")
+                continue
+            if task_id in _pendentes_removidas:
+                registros.append({"op": "descartada", "id": task_id})
+                aplicar_registro_fila(registros[-1])
+            _bases_pendentes.pop(task_id, None)
+            removidas.append(task_id)
+        anexar_fila_saida(registros)
+    notificar_fila_saida()
+    return alteradas, removidas, avisos
+
+# Função para exibir os avisos de conflito na área de detalhes
+def relatar_conflitos(avisos):
+    for aviso in avisos:
+        print(f"[WARNING] {aviso}")
+        janela.after(0, lambda msg=aviso: texto_detalhes.insert(tk.END, f"⚠️ {msg}\n", "info"))
+
+# Sessão HTTP compartilhada por todo o tráfego com o Apps Script: mantém as conexões
+# TLS abertas (keep-alive) entre sincronizações. Opções em config.json, chave "http":
+# {"pool": 4, "timeout": 10, "tentativas": 3, "gzip": false}
+# O Apps Script não vê os cabeçalhos nem os bytes crus do corpo (só o texto), então com
+# "gzip" o JSON compactado vai em base64 dentro de um envelope {"gzip": "..."}
+_sessao_http = None
+_adaptador_http = None
+_lock_sessao_http = threading.Lock()
+
+def obter_config_http(chave, padrao):
+    return (obter_config("http", {}) or {}).get(chave, padrao)
+
+# Pilha de rede importada na primeira requisição (normalmente já na thread de sincronização)
+requests = None
+HTTPAdapter = None
+Retry = None
+
+def importar_rede():
+    global requests, HTTPAdapter, Retry
+    if requests is None:
+        import requests as modulo_requests
+        from requests.adapters import HTTPAdapter as adaptador
+        from urllib3.util.retry import Retry as tentativas
+        HTTPAdapter, Retry = adaptador, tentativas
+        requests = modulo_requests
+    return requests
+
+# Função para obter a sessão HTTP compartilhada (criada na primeira chamada)
+def obter_sessao_http():
+    global _sessao_http, _adaptador_http
+    with _lock_sessao_http:
+        if _sessao_http is None:
+            importar_rede()
+            retries = Retry(total=obter_config_http("tentativas", 3), backoff_factor=0.1,
+                            status_forcelist=[500, 502, 503, 504])
+            # Dois hosts: script.google.com redireciona para script.googleusercontent.com
+            _adaptador_http = HTTPAdapter(pool_connections=2, pool_maxsize=obter_config_http("pool", 4),
+                                          max_retries=retries)
+            _sessao_http = requests.Session()
+            _sessao_http.mount('https://', _adaptador_http)
+            _sessao_http.mount('http://', _adaptador_http)
+            _sessao_http.headers["Connection"] = "keep-alive"
+        return _sessao_http
+
+def tempo_limite_http():
+    return obter_config_http("timeout", 10)
+
+# Função para contar requisições e conexões abertas (reutilizadas = requisições - conexões)
+def estatisticas_http():
+    estatisticas = {"requisicoes": 0, "conexoes": 0}
+    if _adaptador_http is None:
+        return dict(estatisticas, reutilizadas=0)
+    pools = _adaptador_http.poolmanager.pools
+    for chave in list(pools.keys()):
+        pool = pools.get(chave)
+        if pool is not None:
+            estatisticas["requisicoes"] += pool.num_requests
+            estatisticas["conexoes"] += pool.num_connections
+    return dict(estatisticas, reutilizadas=max(0, estatisticas["requisicoes"] - estatisticas["conexoes"]))
+
+# Função para enviar um payload ao Apps Script; retorna o JSON da resposta ou None
+@instrumentar("postar_planilha")
+def postar_planilha(payload):
+    session = obter_sessao_http()
+    try:
+        corpo = json.dumps(payload, ensure_ascii=False, default=serializar_tarefa).encode("utf-8")
+        cabecalhos = {"Content-Type": "application/json"}
+        if obter_config_http("gzip", False):
+            corpo = json.dumps({"gzip": base64.b64encode(gzip.compress(corpo)).decode("ascii")}).encode("utf-8")
+        inicio = time.perf_counter()
+        response = session.post(GOOGLE_SHEETS_API_URL, data=corpo, headers=cabecalhos, timeout=tempo_limite_http())
+        contar("bytes_enviados", len(corpo))
+        contar("bytes_recebidos", len(response.content))
+        log_evento("DEBUG", "sync.post", modo=payload["modo"], status=response.status_code, enviados=len(corpo),
+                   recebidos=len(response.content), ms=round((time.perf_counter() - inicio) * 1000, 1),
+                   **estatisticas_http())
+        if response.status_code == 200:
+            return response.json()
+        janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Falha ao enviar dados: {response.status_code} - {response.text[:200]}\n", "info"))
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"[ERROR] Erro ao enviar dados: {e}")
+        janela.after(0, lambda err=e: texto_detalhes.insert(tk.END, f"⚠️ Erro ao enviar dados: {err}\n", "info"))
+    return None
+
 # Função para enviar tarefas e estados para a planilha (assíncrona)
+# Envia apenas as tarefas criadas/alteradas/removidas desde o último envio, cada uma com
+# a revisão da planilha em que se baseou; a planilha devolve as que mudaram nesse meio
+# tempo, que são mescladas localmente e reenviadas
 def enviar_tarefas_planilha():
+    global versao_planilha
     if not GOOGLE_SHEETS_API_URL:
         janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ URL do Apps Script não configurada no config.json.\n", "info"))
         return False
 
-    tarefas = carregar_tarefas()
-    payload = {
-        "tarefas": tarefas,
-        "estados": estados
-    }
+    with _lock_sincronizacao:
+        alteradas = dict(_pendentes_alteradas)
+        removidas = dict(_pendentes_removidas)
+        bases = {task_id: _bases_pendentes.get(task_id) for task_id in alteradas}
+    tarefas = copiar_tarefas()
+    payload_completo = {"modo": "completo", "tarefas": tarefas, "estados": estados}
+
+    completo = versao_planilha is None
+    if completo:
+        materializar_descricoes(tarefas)
+        resposta = postar_planilha(payload_completo)
+    else:
+        resposta = postar_planilha({
+            "modo": "delta",
+            "versao": versao_planilha,
+            # Na ordem em que as alterações foram feitas (sequência da fila de saída)
+            "alteradas": {task_id: tarefa_para_envio(task_id, tarefas[task_id], bases[task_id])
+                          for task_id in sorted(alteradas, key=alteradas.get) if task_id in tarefas},
+            "removidas": sorted(removidas, key=removidas.get),
+            "estados": estados
+        })
+        if resposta and resposta.get("status") == "conflito":
+            # Apps Script antigo, sem revisões por tarefa
+            print(f"[INFO] Versão local {versao_planilha} diverge da planilha ({resposta.get('versao')}). Enviando tudo.")
+            completo = True
+            materializar_descricoes(tarefas)
+            resposta = postar_planilha(payload_completo)
+    if resposta is None:
+        return False
+    if resposta.get("status") != "success":
+        janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Erro do servidor: {resposta.get('message', 'Desconhecido')}\n", "info"))
+        return False
 
-    session = requests.Session()
-    retries = Retry(total=3, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
+    nova_versao = resposta.get("versao")
+    conflitos = resposta.get("conflitos", {}) or {}
+    aplicadas = {task_id: seq for task_id, seq in alteradas.items() if task_id not in conflitos}
+    if completo:
+        aplicadas = {task_id: alteradas.get(task_id) for task_id in tarefas}
+    # Só avança a versão se ninguém mais escreveu entre a última versão vista e este envio;
+    # caso contrário o próximo pull ainda precisa trazer as alterações dos outros
+    if completo or versao_planilha is None or resposta.get("versao_anterior", versao_planilha) == versao_planilha:
+        versao_planilha = nova_versao
+        salvar_estado_sincronizacao()
+    atuais = obter_tarefas()
+    with _lock_sincronizacao:
+        revisadas = {task_id: dict(atuais[task_id], rev=nova_versao) for task_id in aplicadas
+                     if task_id in atuais and _pendentes_alteradas.get(task_id) == aplicadas[task_id]}
+    salvar_alteracoes_tarefas(alteradas=revisadas, remoto=True)
+    limpar_pendentes(aplicadas, removidas)
+    if conflitos:
+        mescladas, _, avisos = reconciliar_remotas(conflitos, [])
+        salvar_alteracoes_tarefas(alteradas=mescladas, remoto=True)
+        relatar_conflitos(avisos)
+        janela.after(0, atualizar_tarefas)
+        agendar_envio()
+    janela.after(0, lambda: texto_detalhes.insert(tk.END, "✅ Tarefas e estados sincronizados com a planilha.\n", "info"))
+    return True
+
+# Trabalhador de sincronização: os handlers da interface apenas enfileiram um pedido e
+# rajadas de edições são agrupadas em um único envio, fora da thread do Tk
+_fila_envio = queue.Queue()
+_thread_envio = None
+_lock_rede = threading.Lock()  # Nunca enviar e buscar dados da planilha ao mesmo tempo
+# Recuo após um envio que falhou com a fila de saída ainda cheia. Opções em config.json:
+# "reenvio_intervalo_min_s" (5) e "reenvio_intervalo_max_s" (300)
+_atraso_reenvio = None
+_proxima_tentativa = None  # time.monotonic() da próxima tentativa (None = sem recuo)
+
+# Função para pedir um envio à planilha sem bloquear a interface
+def agendar_envio():
+    global _thread_envio
+    if _thread_envio is None or not _thread_envio.is_alive():
+        _thread_envio = threading.Thread(target=trabalhador_envio, daemon=True)
+        _thread_envio.start()
+    _fila_envio.put(time.monotonic())
+    sinalizar_atividade_local()
+
+def trabalhador_envio():
+    global _atraso_reenvio, _proxima_tentativa
+    while True:
+        espera = None if _proxima_tentativa is None else max(0.0, _proxima_tentativa - time.monotonic())
+        try:
+            primeiro_pedido = _fila_envio.get(timeout=espera)
+            if _proxima_tentativa is not None and time.monotonic() < _proxima_tentativa:
+                continue  # Em recuo: a alteração já está na fila de saída e vai na próxima tentativa
+        except queue.Empty:
+            primeiro_pedido = time.monotonic()  # Hora da nova tentativa
+        atraso = obter_config("sincronizacao_atraso_ms", 800) / 1000
+        atraso_maximo = obter_config("sincronizacao_atraso_maximo_ms", 5000) / 1000
+        pedidos = 1
+        # Espera a rajada terminar (ou o atraso máximo) e agrupa todos os pedidos
+        while time.monotonic() - primeiro_pedido < atraso_maximo:
+            try:
+                _fila_envio.get(timeout=atraso)
+                pedidos += 1
+            except queue.Empty:
+                break
+        if pedidos > 1:
+            log_evento("DEBUG", "sync.agrupados", pedidos=pedidos)
+        enviado = False
+        try:
+            # O resultado chega à interface pelos janela.after de enviar_tarefas_planilha
+            with _lock_rede:
+                enviado = enviar_tarefas_planilha()
+        except Exception as e:
+            print(f"[ERROR] Erro no trabalhador de sincronização: {e}")
+            janela.after(0, lambda err=e: texto_detalhes.insert(tk.END, f"⚠️ Erro ao enviar dados: {err}\n", "info"))
+        restantes = tamanho_fila_saida()
+        if enviado or not restantes or not GOOGLE_SHEETS_API_URL:
+            _atraso_reenvio = _proxima_tentativa = None
+        else:
+            minimo = obter_config("reenvio_intervalo_min_s", 5)
+            _atraso_reenvio = minimo if _atraso_reenvio is None else min(obter_config("reenvio_intervalo_max_s", 300),
+                                                                        _atraso_reenvio * 2)
+            _proxima_tentativa = time.monotonic() + _atraso_reenvio * random.uniform(0.8, 1.2)
+            log_evento("WARNING", "sync.reenvio", pendentes=restantes, atraso_s=_atraso_reenvio)
+        notificar_fila_saida()
+
+# Função para retomar o envio da fila de saída já (rede de volta, inicialização)
+def retomar_envio():
+    global _proxima_tentativa
+    if GOOGLE_SHEETS_API_URL and tamanho_fila_saida():
+        _proxima_tentativa = None
+        agendar_envio()
+
+# Função para mostrar o tamanho da fila de saída na barra lateral
+_timer_indicador_fila = None
+
+def notificar_fila_saida():
+    try:
+        janela.after(0, atualizar_indicador_fila)
+    except (NameError, RuntimeError):
+        pass  # Interface ainda não criada (ou já encerrada)
+
+def atualizar_indicador_fila():
+    global _timer_indicador_fila
+    if _timer_indicador_fila:
+        janela.after_cancel(_timer_indicador_fila)
+        _timer_indicador_fila = None
+    restantes = tamanho_fila_saida()
+    if not restantes or not GOOGLE_SHEETS_API_URL:
+        label_fila_saida.configure(text="")
+        return
+    texto = f"📤 {restantes} alteração(ões) aguardando envio"
+    if _proxima_tentativa is not None:
+        texto += f"\nSem conexão. Nova tentativa em {max(0, int(_proxima_tentativa - time.monotonic()))}s"
+        _timer_indicador_fila = janela.after(1000, atualizar_indicador_fila)
+    label_fila_saida.configure(text=texto)
+
+# Função para aplicar na cópia local as tarefas que mudaram na planilha, mesclando em
+# três vias as que também têm alterações locais ainda não enviadas
+def aplicar_alteracoes_remotas(tarefas_remotas, removidas_remotas):
+    alteradas, removidas, avisos = reconciliar_remotas(tarefas_remotas, removidas_remotas)
+    salvar_alteracoes_tarefas(alteradas=alteradas, removidas=removidas, remoto=True)
+    relatar_conflitos(avisos)
+    return len(alteradas) + len(removidas)
+
+# Descrições sob demanda no protocolo: com "sem_descricao" o Apps Script manda só um hash da
+# descrição (descricao_hash) e avisa que entende envios sem descrição (descricoes_sob_demanda);
+# aí um delta só leva a descrição quando ela mudou. Apps Script antigos ignoram o parâmetro
+_servidor_descricoes_sob_demanda = False
+
+# Função para baixar descrições da planilha (?descricoes=id1,id2); retorna {task_id: descrição}
+def buscar_descricoes_planilha(ids):
+    if not GOOGLE_SHEETS_API_URL or not ids:
+        return {}
+    try:
+        inicio = time.perf_counter()
+        response = obter_sessao_http().get(GOOGLE_SHEETS_API_URL, params={"descricoes": ",".join(ids)},
+                                           timeout=tempo_limite_http())
+        contar("bytes_recebidos", len(response.content))
+        log_evento("DEBUG", "sync.descricoes", pedidas=len(ids), status=response.status_code,
+                   recebidos=len(response.content), ms=round((time.perf_counter() - inicio) * 1000, 1))
+        if response.status_code != 200:
+            return {}
+        descricoes = response.json().get("descricoes", {})
+        return descricoes if isinstance(descricoes, dict) else {}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"[ERROR] Erro ao baixar descrições: {e}")
+        return {}
 
+# Função para completar as tarefas recebidas sem descrição: se o hash bate com a descrição
+# local ela é reaproveitada; as pendências locais (que serão mescladas) baixam a remota já;
+# as demais ficam com descricao_hash até alguém abrir a tarefa
+def completar_descricoes_remotas(tarefas_remotas):
+    locais = obter_tarefas()
+    with _lock_sincronizacao:
+        pendentes = set(_pendentes_alteradas)
+    baixar = []
+    for task_id, remota in tarefas_remotas.items():
+        if "descricao" in remota or "descricao_hash" not in remota:
+            continue
+        local = locais.get(task_id)
+        atual = descricao_tarefa(task_id, local) if local is not None else None
+        if atual is not None and hash_descricao(atual) == remota["descricao_hash"]:
+            remota["descricao"] = atual
+            del remota["descricao_hash"]
+        elif task_id in pendentes:
+            baixar.append(task_id)
+    for task_id, descricao in buscar_descricoes_planilha(baixar).items():
+        if task_id in tarefas_remotas:
+            tarefas_remotas[task_id]["descricao"] = descricao
+            tarefas_remotas[task_id].pop("descricao_hash", None)
+
+# Função para montar a tarefa de um envio delta (sem a descrição quando ela não mudou)
+def tarefa_para_envio(task_id, task, base):
+    dados = dict(task)
+    if _servidor_descricoes_sob_demanda and "descricao_hash" not in dados:
+        anterior = descricao_tarefa(task_id, base) if base is not None else None
+        if anterior is not None and anterior == descricao_tarefa(task_id, task):
+            dados.pop("descricao", None)
+    # Sem a descrição (ainda não baixada) o Apps Script mantém a que já está na planilha;
+    # uma tarefa com descricao_hash veio de um Apps Script que entende isso, então nunca
+    # se envia "" no lugar do texto que só a planilha tem
+    if dados.pop("descricao_hash", None) is None and "descricao" not in dados and not _servidor_descricoes_sob_demanda:
+        dados["descricao"] = descricao_tarefa(task_id, task) or ""
+    return dados
+
+# Função para buscar da planilha (em thread); retorna "alterado", "inalterado" ou "erro"
+# Com uma versão conhecida pede só as linhas alteradas desde ela (?desde=<versão>)
+@instrumentar("buscar_da_planilha")
+def buscar_da_planilha():
+    global estados, versao_planilha, _servidor_descricoes_sob_demanda
+    if not GOOGLE_SHEETS_API_URL:
+        janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ URL do Apps Script não configurada no config.json.\n", "info"))
+        return "erro"
     try:
-        print(f"[DEBUG] Enviando tarefas e estados para {GOOGLE_SHEETS_API_URL}")
-        response = session.post(GOOGLE_SHEETS_API_URL, json=payload, timeout=10)
-        print(f"[DEBUG] Resposta do servidor: {response.status_code}, {response.text}")
-        if response.status_code == 200:
-            resposta = response.json()
-            if resposta.get("status") == "success":
-                janela.after(0, lambda: texto_detalhes.insert(tk.END, "✅ Tarefas e estados sincronizados com a planilha.\n", "info"))
-                return True
-            else:
-                janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Erro do servidor: {resposta.get('message', 'Desconhecido')}\n", "info"))
-                return False
+        parametros = {"desde": versao_planilha} if versao_planilha is not None else {}
+        if obter_config("descricoes_sob_demanda", True):
+            parametros["sem_descricao"] = 1
+        inicio = time.perf_counter()
+        response = obter_sessao_http().get(GOOGLE_SHEETS_API_URL, params=parametros, timeout=tempo_limite_http())
+        contar("bytes_recebidos", len(response.content))
+        log_evento("DEBUG", "sync.get", desde=versao_planilha, status=response.status_code,
+                   recebidos=len(response.content), ms=round((time.perf_counter() - inicio) * 1000, 1))
+        if response.status_code != 200:
+            janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Falha ao buscar dados: {response.status_code} - {response.text[:200]}\n", "info"))
+            return "erro"
+        dados = response.json()
+        if dados.get("status") == "error":
+            janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Erro do servidor: {dados.get('message', 'Desconhecido')}\n", "info"))
+            return "erro"
+        if bool(dados.get("descricoes_sob_demanda")) != _servidor_descricoes_sob_demanda:
+            _servidor_descricoes_sob_demanda = bool(dados.get("descricoes_sob_demanda"))
+            salvar_estado_sincronizacao()
+        if _proxima_tentativa is not None:
+            retomar_envio()  # A planilha voltou a responder: não espera o fim do recuo
+        if dados.get("status") == "inalterado":
+            return "inalterado"
+        tarefas_planilha = dados.get("tarefas", {})
+        estados_planilha = dados.get("estados", [])
+        if not isinstance(tarefas_planilha, dict) or not all(isinstance(v, dict) for v in tarefas_planilha.values()):
+            janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ Dados de tarefas inválidos recebidos do servidor.\n", "info"))
+            return "erro"
+        if not isinstance(estados_planilha, list) or not all(isinstance(e, str) for e in estados_planilha):
+            janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ Dados de estados inválidos recebidos do servidor.\n", "info"))
+            estados_planilha = estados
+        if set(estados_planilha) != set(estados):
+            estados[:] = estados_planilha
+            salvar_configuracoes(GOOGLE_SHEETS_URL, estados, CORES_COLUNAS)
+            janela.after(0, reordenar_colunas)
+        completar_descricoes_remotas(tarefas_planilha)
+        if dados.get("incremental"):
+            total = aplicar_alteracoes_remotas(tarefas_planilha, dados.get("removidas", []))
+            print(f"[INFO] {total} alteração(ões) recebidas da planilha.")
+            versao_planilha = dados.get("versao")
         else:
-            janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Falha ao enviar dados: {response.status_code} - {response.text}\n", "info"))
-            return False
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] Erro ao enviar dados: {e}")
-        janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Erro ao enviar dados: {e}\n", "info"))
-        return False
+            # Cópia completa: o que não veio da planilha foi excluído lá, exceto o que é pendência local
+            with _lock_sincronizacao:
+                pendentes = set(_pendentes_alteradas) | set(_pendentes_removidas)
+            removidas_remotas = [task_id for task_id in copiar_tarefas()
+                                 if task_id not in tarefas_planilha and task_id not in pendentes]
+            alteradas, removidas, avisos = reconciliar_remotas(tarefas_planilha, removidas_remotas)
+            tarefas_finais = copiar_tarefas()
+            tarefas_finais.update(alteradas)
+            for task_id in removidas:
+                tarefas_finais.pop(task_id, None)
+            salvar_tarefas(tarefas_finais)
+            relatar_conflitos(avisos)
+            versao_planilha = dados.get("versao")
+        salvar_estado_sincronizacao()
+        janela.after(0, atualizar_tarefas)
+        janela.after(0, lambda: texto_detalhes.insert(tk.END, "✅ Tarefas e estados sincronizados da planilha.\n", "info"))
+        janela.after(0, listar_tarefas_em_execucao)
+        return "alterado"
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"[ERROR] Erro ao sincronizar: {e}")
+        janela.after(0, lambda err=e: texto_detalhes.insert(tk.END, f"⚠️ Erro ao sincronizar: {err}\n", "info"))
+        return "erro"
 
 # Função para sincronizar com Google Sheets (assíncrona)
 def sincronizar_com_planilha():
     def sincronizar_thread():
-        global estados
-        if not GOOGLE_SHEETS_API_URL:
-            janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ URL do Apps Script não configurada no config.json.\n", "info"))
+        with _lock_rede:
+            buscar_da_planilha()
+    threading.Thread(target=sincronizar_thread, daemon=True).start()
+
+# Sincronização automática: consulta a planilha em intervalo adaptativo — rápido enquanto
+# o quadro muda, com recuo exponencial quando está parado ou o Apps Script falha.
+# Opções em config.json, chave "auto_sincronizacao":
+# {"ativa": true, "intervalo_min_s": 15, "intervalo_max_s": 600, "variacao": 0.2}
+_intervalo_auto = None
+_timer_auto = None
+
+def obter_config_auto(chave, padrao):
+    return (obter_config("auto_sincronizacao", {}) or {}).get(chave, padrao)
+
+# Função para iniciar o agendador (chamada uma vez na inicialização)
+def iniciar_auto_sincronizacao():
+    global _intervalo_auto
+    if not obter_config_auto("ativa", True):
+        print("[INFO] Sincronização automática desativada no config.json.")
+        return
+    _intervalo_auto = obter_config_auto("intervalo_min_s", 15)
+    agendar_proxima_sincronizacao()
+
+def agendar_proxima_sincronizacao():
+    global _timer_auto
+    if _intervalo_auto is None:
+        return
+    variacao = obter_config_auto("variacao", 0.2)
+    # A variação aleatória evita que vários computadores consultem a planilha juntos
+    atraso = _intervalo_auto * random.uniform(1 - variacao, 1 + variacao)
+    if _timer_auto:
+        janela.after_cancel(_timer_auto)
+    _timer_auto = janela.after(int(atraso * 1000), executar_auto_sincronizacao)
+
+def executar_auto_sincronizacao():
+    def auto_thread():
+        # Se outra sincronização estiver em andamento, esta rodada é pulada
+        if not _lock_rede.acquire(blocking=False):
+            janela.after(0, lambda: ajustar_intervalo_auto("ocupado"))
             return
-        session = requests.Session()
-        retries = Retry(total=3, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504])
-        session.mount('https://', HTTPAdapter(max_retries=retries))
+        # Qualquer falha conta como "erro": a próxima rodada precisa ser agendada de qualquer forma
+        resultado = "erro"
         try:
-            print(f"[DEBUG] Buscando tarefas e estados de {GOOGLE_SHEETS_API_URL}")
-            response = session.get(GOOGLE_SHEETS_API_URL, timeout=10)
-            print(f"[DEBUG] Resposta do servidor: {response.status_code}, {response.text}")
-            if response.status_code == 200:
-                dados = response.json()
-                if dados.get("status") == "error":
-                    janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Erro do servidor: {dados.get('message', 'Desconhecido')}\n", "info"))
-                    return
-                tarefas_planilha = dados.get("tarefas", {})
-                estados_planilha = dados.get("estados", [])
-                if not isinstance(tarefas_planilha, dict) or not all(isinstance(v, dict) for v in tarefas_planilha.values()):
-                    janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ Dados de tarefas inválidos recebidos do servidor.\n", "info"))
-                    return
-                if not isinstance(estados_planilha, list) or not all(isinstance(e, str) for e in estados_planilha):
-                    janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ Dados de estados inválidos recebidos do servidor.\n", "info"))
-                    estados_planilha = estados
-                if set(estados_planilha) != set(estados):
-                    estados[:] = estados_planilha
-                    salvar_configuracoes(GOOGLE_SHEETS_URL, estados, CORES_COLUNAS)
-                    janela.after(0, reordenar_colunas)
-                salvar_tarefas(tarefas_planilha)
-                janela.after(0, atualizar_tarefas)
-                janela.after(0, lambda: texto_detalhes.insert(tk.END, "✅ Tarefas e estados sincronizados da planilha.\n", "info"))
-                janela.after(0, listar_tarefas_em_execucao)
-            else:
-                janela.after(0, lambda: texto_detalhes.insert(tk.END, f"⚠️ Falha ao buscar dados: {response.status_code} - {response.text}\n", "info"))
-        except requests.exceptions.RequestException as e:
-            print(f"[ERROR] Erro ao sincronizar: {e}")
-            janela.after(0, lambda err=e: texto_detalhes.insert(tk.END, f"⚠️ Erro ao sincronizar: {err}\n", "info"))
-    threading.Thread(target=sincronizar_thread, daemon=True).start()
+            resultado = buscar_da_planilha() if GOOGLE_SHEETS_API_URL else "inalterado"
+        except Exception as e:
+            print(f"[ERROR] Erro inesperado na sincronização automática: {e}")
+        finally:
+            _lock_rede.release()
+            janela.after(0, lambda: ajustar_intervalo_auto(resultado))
+    threading.Thread(target=auto_thread, daemon=True).start()
+
+# Função para recalcular o intervalo a partir do resultado da última consulta
+def ajustar_intervalo_auto(resultado):
+    global _intervalo_auto
+    if _intervalo_auto is None:
+        return
+    minimo = obter_config_auto("intervalo_min_s", 15)
+    maximo = obter_config_auto("intervalo_max_s", 600)
+    if resultado == "alterado":
+        _intervalo_auto = minimo
+    elif resultado != "ocupado":
+        _intervalo_auto = min(maximo, _intervalo_auto * 2)
+    log_evento("DEBUG", "sync.auto", proxima_s=f"{_intervalo_auto:.0f}", resultado=resultado)
+    agendar_proxima_sincronizacao()
+
+# Função para voltar ao intervalo mínimo quando há edições locais
+def sinalizar_atividade_local():
+    global _intervalo_auto
+    if _intervalo_auto is not None and _intervalo_auto > obter_config_auto("intervalo_min_s", 15):
+        _intervalo_auto = obter_config_auto("intervalo_min_s", 15)
+        janela.after(0, agendar_proxima_sincronizacao)
 
 # Função para listar tarefas em execução
 def listar_tarefas_em_execucao():
     try:
-        tarefas = carregar_tarefas()
-        tarefas_em_execucao = [f"Ticket {task_id}: {task['titulo']}" for task_id, task in tarefas.items() if task.get("estado") == "In Progress"]
+        tarefas = obter_tarefas()
+        tarefas_em_execucao = [f"Ticket {task_id}: {tarefas[task_id]['titulo']}" for task_id in ids_tarefas_no_estado("In Progress")]
         texto_detalhes.delete("1.0", tk.END)
         if tarefas_em_execucao:
             texto_detalhes.insert(tk.END, "Tarefas em Execução:\n", "subtitulo")
@@ -368,8 +2133,18 @@ def listar_tarefas_em_execucao():
         print(f"[ERROR] Erro ao listar tarefas em execução: {e}")
         texto_detalhes.insert(tk.END, f"⚠️ Erro ao listar tarefas: {e}\n", "info")
 
+# Função para calcular a altura disponível para as colunas (força o cálculo de geometria pendente)
+def altura_disponivel_colunas():
+    janela.update_idletasks()
+    canvas_height = frame_kanban_canvas.winfo_height() or 600
+    scrollbar_height = scrollbar_horizontal.winfo_height() if scrollbar_horizontal.winfo_viewable() else 0
+    return canvas_height - scrollbar_height - 10
+
 # Função para criar uma coluna no Kanban
-def criar_coluna(estado):
+# Cada coluna é virtualizada: o canvas tem a altura de todos os cartões, mas só os
+# cartões na área visível (mais uma pequena sobra) existem como widgets, reciclados ao rolar
+def criar_coluna(estado, altura=None):
+    global _render_completo
     try:
         if estado not in estados:
             print(f"[WARNING] Estado {estado} não está na lista de estados. Ignorando.")
@@ -387,187 +2162,337 @@ def criar_coluna(estado):
         canvas_tarefas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar_vertical = ttk.Scrollbar(frame_canvas, orient="vertical", command=canvas_tarefas.yview, style="Custom.Vertical.TScrollbar")
         scrollbar_vertical.pack(side=tk.RIGHT, fill=tk.Y)
-        canvas_tarefas.configure(yscrollcommand=scrollbar_vertical.set)
 
-        janela.update_idletasks()
-        canvas_height = frame_kanban_canvas.winfo_height() or 600
-        scrollbar_height = scrollbar_horizontal.winfo_height() if scrollbar_horizontal.winfo_viewable() else 0
-        available_height = canvas_height - scrollbar_height - 10
+        available_height = altura if altura is not None else altura_disponivel_colunas()
         canvas_tarefas.configure(height=available_height)
 
-        raio = 20
-        canvas_tarefas.create_rectangle(raio, 2, 150, available_height - 2, fill=cor_coluna, outline="", tags="bg_rect")
-        canvas_tarefas.create_oval(2, 2, 2 + 2 * raio, 2 + 2 * raio, fill=cor_coluna, outline="", tags="corner")
-        frame_tarefas = tk.Frame(canvas_tarefas, bg=cor_coluna)
-        canvas_tarefas.create_window((0, 0), window=frame_tarefas, anchor="nw")
-
-        def atualizar_scrollregion(event):
-            canvas_tarefas.configure(scrollregion=canvas_tarefas.bbox("all"))
-        frame_tarefas.bind("<Configure>", atualizar_scrollregion)
-
-        def scroll_canvas(event):
-            if event.widget == canvas_tarefas or isinstance(event.widget, tk.Canvas):
-                if event.delta:
-                    canvas_tarefas.yview_scroll(-1 * (event.delta // 120), "units")
-                elif event.num == 4:
-                    canvas_tarefas.yview_scroll(-1, "units")
-                elif event.num == 5:
-                    canvas_tarefas.yview_scroll(1, "units")
-                return "break"
+        coluna = {"canvas": canvas_tarefas, "frame_coluna": frame_coluna, "label": label_coluna,
+                  "estado": estado, "ids": [], "slots": [], "render_agendado": None,
+                  "desenhado": modo_cartoes_desenhados(), "slot_por_item": {}, "tamanho_fundo": None}
+        desenhar_fundo_coluna(coluna, 150, available_height)
+        if coluna["desenhado"]:
+            # Um único conjunto de bindings por coluna; o item sob o mouse identifica o cartão
+            canvas_tarefas.tag_bind("cartao", "<Button-1>", lambda e: clicar_cartao_desenhado(coluna, e))
+            canvas_tarefas.tag_bind("cartao", "<Control-Button-1>",
+                                    lambda e: alternar_selecao(cartao_sob_mouse(coluna)["task_id"]))
+            canvas_tarefas.tag_bind("cartao", "<B1-Motion>", arrastar_tarefa)
+            canvas_tarefas.tag_bind("cartao", "<ButtonRelease-1>", lambda e: soltar_tarefa(e, arrastando))
+            canvas_tarefas.tag_bind("cartao", "<Double-Button-1>", lambda e: clicar_duas_vezes_cartao(coluna))
+
+        # Rolar (pela barra ou pela roda do mouse) materializa os cartões que entram na área visível
+        def ao_rolar(*args):
+            scrollbar_vertical.set(*args)
+            agendar_renderizacao(coluna)
+        canvas_tarefas.configure(yscrollcommand=ao_rolar)
+        canvas_tarefas.bind("<Configure>", lambda e: agendar_renderizacao(coluna))
         canvas_tarefas.bind("<Enter>", lambda e: canvas_tarefas.focus_set())
-        canvas_tarefas.bind("<MouseWheel>", scroll_canvas)
-        canvas_tarefas.bind("<Button-4>", scroll_canvas)
-        canvas_tarefas.bind("<Button-5>", scroll_canvas)
-        frame_tarefas.bind("<MouseWheel>", lambda e: "break")
-        frame_tarefas.bind("<Button-4>", lambda e: "break")
-        frame_tarefas.bind("<Button-5>", lambda e: "break")
+        canvas_tarefas.bind("<MouseWheel>", lambda e: rolar_coluna(coluna, e))
+        canvas_tarefas.bind("<Button-4>", lambda e: rolar_coluna(coluna, e))
+        canvas_tarefas.bind("<Button-5>", lambda e: rolar_coluna(coluna, e))
 
         # Context menu for column header
         def show_context_menu(event):
             try:
                 context_menu = tk.Menu(janela)  # Removed tearoff
-                context_menu.add_command(label="Editar Nome", command=lambda: editar_nome_coluna(estado))
-                context_menu.add_command(label="Alterar Cor", command=lambda: editar_cor_coluna(estado))
-                context_menu.add_command(label="Excluir Coluna", command=lambda: excluir_coluna(estado))
+                context_menu.add_command(label="Editar Nome", command=lambda: editar_nome_coluna(coluna["estado"]))
+                context_menu.add_command(label="Alterar Cor", command=lambda: editar_cor_coluna(coluna["estado"]))
+                context_menu.add_command(label="Excluir Coluna", command=lambda: excluir_coluna(coluna["estado"]))
+                context_menu.add_command(label="Selecionar Tarefas", command=lambda: selecionar_coluna(coluna))
                 context_menu.post(event.x_root, event.y_root)
             except Exception as e:
                 print(f"[ERROR] Erro ao criar menu de contexto: {e}")
 
-        # Bindings
+        # Bindings (leem coluna["estado"], que muda quando a coluna é renomeada no lugar)
         label_coluna.bind("<Button-3>", show_context_menu)  # Right-click for context menu
-        label_coluna.bind("<Double-Button-1>", lambda e: editar_nome_coluna(estado))  # Double-click to edit name
-        label_coluna.bind("<Button-1>", lambda e: iniciar_arrasto_coluna(e, estado))
+        label_coluna.bind("<Double-Button-1>", lambda e: editar_nome_coluna(coluna["estado"]))  # Double-click to edit name
+        label_coluna.bind("<Button-1>", lambda e: iniciar_arrasto_coluna(e, coluna["estado"]))
         label_coluna.bind("<B1-Motion>", arrastar_coluna)
-        label_coluna.bind("<ButtonRelease-1>", lambda e: soltar_coluna(e, estado))
+        label_coluna.bind("<ButtonRelease-1>", lambda e: soltar_coluna(e, coluna["estado"]))
 
-        if frame_coluna and canvas_tarefas and frame_tarefas:
-            colunas[estado] = {"canvas": canvas_tarefas, "frame": frame_tarefas, "frame_coluna": frame_coluna}
+        if frame_coluna and canvas_tarefas:
+            colunas[estado] = coluna
+            # Coluna nova começa vazia: a próxima atualização reconstrói as listas de ids
+            _render_completo = True
             atualizar_layout_colunas()
     except Exception as e:
         print(f"[ERROR] Erro ao criar coluna {estado}: {e}")
 
-# Função para criar widget de tarefa
-def criar_widget_tarefa(task_id, task_data, frame_coluna):
-    try:
-        frame_tarefa = tk.Frame(frame_coluna, bg="#000000", bd=1, relief="raised")
-        frame_tarefa.pack(fill=tk.X, padx=5, pady=2)
-
-        frame_topo = tk.Frame(frame_tarefa, bg="#000000")
-        frame_topo.pack(fill=tk.X)
+# Função para rolar a coluna com a roda do mouse (sobre o canvas ou sobre um cartão)
+def rolar_coluna(coluna, event):
+    canvas_tarefas = coluna["canvas"]
+    if event.delta:
+        canvas_tarefas.yview_scroll(-1 * (event.delta // 120), "units")
+    elif event.num == 4:
+        canvas_tarefas.yview_scroll(-1, "units")
+    elif event.num == 5:
+        canvas_tarefas.yview_scroll(1, "units")
+    return "break"
 
-        prioridade = task_data.get("prioridade", "Média")
+# Função para abrir a janela de opções (editar/apagar) de uma tarefa
+def abrir_janela_opcoes(task_id):
+    try:
+        janela_opcoes = tk.Toplevel(janela)
+        janela_opcoes.title(f"Opções da Tarefa {task_id}")
+        janela_opcoes.geometry("200x150")
+        janela_opcoes.configure(bg="#2e2e2e")
+        janela_opcoes.resizable(False, False)
+
+        janela_opcoes.update_idletasks()
+        width = janela_opcoes.winfo_width()
+        height = janela_opcoes.winfo_height()
+        x = (janela_opcoes.winfo_screenwidth() // 2) - (width // 2)
+        y = (janela_opcoes.winfo_screenheight() // 2) - (height // 2)
+        janela_opcoes.geometry(f"{width}x{height}+{x}+{y}")
+
+        tk.Label(janela_opcoes, text="Escolha uma opção:", bg="#2e2e2e", fg="#ffffff", font=("Arial", 10)).pack(pady=10)
+
+        btn_editar = tk.Button(janela_opcoes, text="Editar", command=lambda: [janela_opcoes.destroy(), editar_tarefa(task_id)],
+                               bg="#007acc", fg="#ffffff", relief="flat", width=15)
+        btn_editar.pack(pady=5)
+
+        btn_apagar = tk.Button(janela_opcoes, text="Apagar", command=lambda: [janela_opcoes.destroy(), excluir_tarefa(task_id)],
+                               bg="#ff4d4d", fg="#ffffff", relief="flat", width=15)
+        btn_apagar.pack(pady=5)
+    except Exception as e:
+        print(f"[ERROR] Erro ao abrir janela de opções para tarefa {task_id}: {e}")
+
+# Função para criar um cartão reciclável (slot); a tarefa exibida muda a cada renderização,
+# por isso os bindings leem slot["task_id"] no momento do evento
+def criar_slot_cartao(coluna):
+    canvas_tarefas = coluna["canvas"]
+    frame_tarefa = tk.Frame(canvas_tarefas, bg="#000000", bd=1, relief="raised", height=ALTURA_CARTAO)
+    frame_tarefa.pack_propagate(False)
+
+    frame_topo = tk.Frame(frame_tarefa, bg="#000000")
+    frame_topo.pack(fill=tk.X)
+
+    label_prioridade = tk.Label(frame_topo, text="", bg="#000000", font=("Arial", 8, "bold"))
+    label_prioridade.pack(side=tk.LEFT, padx=5)
+
+    btn_menu = tk.Label(frame_topo, text="⋮", bg="#000000", fg="#ffffff", font=("Arial", 12, "bold"), cursor="hand2")
+    btn_menu.pack(side=tk.RIGHT, padx=5)
+
+    label_tarefa = tk.Label(frame_tarefa, text="", bg="#000000", fg="#ffffff", font=("Arial", 10),
+                            anchor="nw", justify=tk.LEFT)
+    label_tarefa.pack(pady=5, padx=5, fill=tk.BOTH, expand=True)
+
+    slot = {"frame": frame_tarefa, "label_tarefa": label_tarefa, "label_prioridade": label_prioridade,
+            "fundos": (frame_tarefa, frame_topo, label_prioridade, btn_menu, label_tarefa),
+            "task_id": None, "exibido": None, "posicao": None,
+            "janela": canvas_tarefas.create_window(5, 0, window=frame_tarefa, anchor="nw", state="hidden")}
+
+    btn_menu.bind("<Button-1>", lambda e: abrir_janela_opcoes(slot["task_id"]))
+    for widget in (frame_tarefa, label_tarefa, label_prioridade):
+        widget.bind("<Button-1>", lambda e: iniciar_arrasto(e, slot["task_id"]))
+        widget.bind("<Control-Button-1>", lambda e: alternar_selecao(slot["task_id"]))
+        widget.bind("<B1-Motion>", arrastar_tarefa)
+        widget.bind("<ButtonRelease-1>", lambda e: soltar_tarefa(e, slot["task_id"]))
+    for widget in (frame_tarefa, frame_topo, label_tarefa, label_prioridade, btn_menu):
+        for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(evento, lambda e: rolar_coluna(coluna, e))
+    label_tarefa.bind("<Double-Button-1>", lambda e: mostrar_detalhes(slot["task_id"]))
+    coluna["slots"].append(slot)
+    return slot
+
+# Modo de renderização: "widgets" (Frame/Label por cartão visível) ou "canvas"
+# (retângulo e textos desenhados direto no canvas da coluna), em config.json
+def modo_cartoes_desenhados():
+    return obter_config("renderizacao", "widgets") == "canvas"
+
+# Função para criar um cartão desenhado no canvas; todos os itens levam as tags
+# "cartao" e a tag própria do slot, e ficam indexados em coluna["slot_por_item"]
+def criar_slot_desenhado(coluna):
+    canvas_tarefas = coluna["canvas"]
+    tag = f"slot{len(coluna['slots'])}"
+    itens = {
+        "fundo": canvas_tarefas.create_rectangle(0, 0, 0, 0, fill="#000000", outline="#444444",
+                                                 tags=("cartao", tag)),
+        "prioridade": canvas_tarefas.create_text(0, 0, anchor="nw", font=("Arial", 8, "bold"),
+                                                 tags=("cartao", tag)),
+        "menu": canvas_tarefas.create_text(0, 0, anchor="ne", text="⋮", fill="#ffffff",
+                                           font=("Arial", 12, "bold"), tags=("cartao", "menu", tag)),
+        "titulo": canvas_tarefas.create_text(0, 0, anchor="nw", fill="#ffffff", font=("Arial", 10),
+                                             tags=("cartao", "titulo", tag)),
+    }
+    canvas_tarefas.itemconfigure(tag, state="hidden")
+    slot = {"tag": tag, "itens": itens, "task_id": None, "exibido": None, "posicao": None, "canvas": canvas_tarefas}
+    for item in itens.values():
+        coluna["slot_por_item"][item] = slot
+    coluna["slots"].append(slot)
+    return slot
+
+# Função para descobrir o cartão sob o mouse (item "current" do canvas)
+def cartao_sob_mouse(coluna):
+    itens = coluna["canvas"].find_withtag("current")
+    return coluna["slot_por_item"].get(itens[0], {"task_id": None}) if itens else {"task_id": None}
+
+def clicar_cartao_desenhado(coluna, event):
+    slot = cartao_sob_mouse(coluna)
+    if slot["task_id"] is None:
+        return
+    if "menu" in coluna["canvas"].gettags("current"):
+        abrir_janela_opcoes(slot["task_id"])
+    else:
+        iniciar_arrasto(event, slot["task_id"])
+
+# O duplo clique fica na mesma tag do <Button-1>: assim o Tk o escolhe no lugar do clique simples
+# (que iniciaria um arrasto) e só o título do cartão abre os detalhes
+def clicar_duas_vezes_cartao(coluna):
+    slot = cartao_sob_mouse(coluna)
+    if slot["task_id"] is not None and "titulo" in coluna["canvas"].gettags("current"):
+        mostrar_detalhes(slot["task_id"])
+
+# Função para exibir uma tarefa em um cartão desenhado
+def preencher_slot_desenhado(slot, task_id, task_data, indice, largura):
+    canvas_tarefas = slot["canvas"]
+    itens = slot["itens"]
+    prioridade = task_data.get("prioridade", PRIORIDADE_PADRAO)
+    exibido = (task_data.get("titulo", "Sem título"), prioridade, largura, task_id in tarefas_selecionadas)
+    if slot["task_id"] != task_id or slot["exibido"] != exibido:
+        canvas_tarefas.itemconfigure(itens["fundo"], fill=COR_CARTAO_SELECIONADO if exibido[3] else COR_CARTAO)
+        titulo = f"Ticket {task_id}: {exibido[0]}"
+        if len(titulo) > MAX_TITULO_DESENHADO:
+            titulo = titulo[:MAX_TITULO_DESENHADO - 1] + "…"
         cor_prioridade = {"Alta": "#ff4d4d", "Média": "#ffcc00", "Baixa": "#00cc00"}.get(prioridade, "#ffcc00")
-        label_prioridade = tk.Label(frame_topo, text=prioridade, bg="#000000", fg=cor_prioridade, font=("Arial", 8, "bold"))
-        label_prioridade.pack(side=tk.LEFT, padx=5)
-
-        btn_menu = tk.Label(frame_topo, text="⋮", bg="#000000", fg="#ffffff", font=("Arial", 12, "bold"), cursor="hand2")
-        btn_menu.pack(side=tk.RIGHT, padx=5)
-
-        coluna_width = frame_coluna.master.winfo_width() or 150
-        label_tarefa = tk.Label(frame_tarefa, text=f"Ticket {task_id}: {task_data.get('titulo', 'Sem título')}",
-                                bg="#000000", fg="#ffffff", font=("Arial", 10), wraplength=max(50, coluna_width - 30))
-        label_tarefa.pack(pady=5, padx=5, fill=tk.X)
-
-        tarefas_widgets[task_id] = {
-            "frame": frame_tarefa,
-            "label_tarefa": label_tarefa,
-            "label_prioridade": label_prioridade
-        }
-
-        def abrir_janela_opcoes(event):
-            try:
-                janela_opcoes = tk.Toplevel(janela)
-                janela_opcoes.title(f"Opções da Tarefa {task_id}")
-                janela_opcoes.geometry("200x150")
-                janela_opcoes.configure(bg="#2e2e2e")
-                janela_opcoes.resizable(False, False)
-
-                janela_opcoes.update_idletasks()
-                width = janela_opcoes.winfo_width()
-                height = janela_opcoes.winfo_height()
-                x = (janela_opcoes.winfo_screenwidth() // 2) - (width // 2)
-                y = (janela_opcoes.winfo_screenheight() // 2) - (height // 2)
-                janela_opcoes.geometry(f"{width}x{height}+{x}+{y}")
-
-                tk.Label(janela_opcoes, text="Escolha uma opção:", bg="#2e2e2e", fg="#ffffff", font=("Arial", 10)).pack(pady=10)
-
-                btn_editar = tk.Button(janela_opcoes, text="Editar", command=lambda: [janela_opcoes.destroy(), editar_tarefa(task_id)],
-                                       bg="#007acc", fg="#ffffff", relief="flat", width=15)
-                btn_editar.pack(pady=5)
-
-                btn_apagar = tk.Button(janela_opcoes, text="Apagar", command=lambda: [janela_opcoes.destroy(), excluir_tarefa(task_id)],
-                                       bg="#ff4d4d", fg="#ffffff", relief="flat", width=15)
-                btn_apagar.pack(pady=5)
-            except Exception as e:
-                print(f"[ERROR] Erro ao abrir janela de opções para tarefa {task_id}: {e}")
-
-        btn_menu.bind("<Button-1>", abrir_janela_opcoes)
-
-        for widget in (frame_tarefa, label_tarefa, label_prioridade):
-            widget.bind("<Button-1>", lambda e: iniciar_arrasto(e, task_id))
-            widget.bind("<B1-Motion>", arrastar_tarefa)
-            widget.bind("<ButtonRelease-1>", lambda e: soltar_tarefa(e, task_id))
-        label_tarefa.bind("<Double-Button-1>", lambda e: mostrar_detalhes(task_id))
+        canvas_tarefas.itemconfigure(itens["prioridade"], text=prioridade, fill=cor_prioridade)
+        canvas_tarefas.itemconfigure(itens["titulo"], text=titulo, width=max(50, largura - 30))
+        slot["exibido"] = exibido
+    posicao = (ESPACO_CARTAO + indice * (ALTURA_CARTAO + ESPACO_CARTAO), largura)
+    if slot["posicao"] != posicao:
+        y = posicao[0]
+        canvas_tarefas.coords(itens["fundo"], 5, y, max(55, largura - 5), y + ALTURA_CARTAO)
+        canvas_tarefas.coords(itens["prioridade"], 10, y + 4)
+        canvas_tarefas.coords(itens["menu"], max(55, largura - 10), y + 1)
+        canvas_tarefas.coords(itens["titulo"], 10, y + 20)
+        canvas_tarefas.itemconfigure(slot["tag"], state="normal")
+        slot["posicao"] = posicao
+    if slot["task_id"] != task_id:
+        if tarefas_widgets.get(slot["task_id"]) is slot:
+            del tarefas_widgets[slot["task_id"]]
+        slot["task_id"] = task_id
+    tarefas_widgets[task_id] = slot
+
+# Função para exibir uma tarefa em um slot, reconfigurando só o que mudou
+def preencher_slot(slot, task_id, task_data, indice, largura):
+    if "itens" in slot:
+        preencher_slot_desenhado(slot, task_id, task_data, indice, largura)
+        return
+    canvas_tarefas = slot["frame"].master
+    prioridade = task_data.get("prioridade", PRIORIDADE_PADRAO)
+    exibido = (task_data.get("titulo", "Sem título"), prioridade, largura, task_id in tarefas_selecionadas)
+    if slot["task_id"] != task_id or slot["exibido"] != exibido:
+        if slot["exibido"] is None or slot["exibido"][3] != exibido[3]:
+            for widget in slot["fundos"]:
+                widget.configure(bg=COR_CARTAO_SELECIONADO if exibido[3] else COR_CARTAO)
+        cor_prioridade = {"Alta": "#ff4d4d", "Média": "#ffcc00", "Baixa": "#00cc00"}.get(prioridade, "#ffcc00")
+        slot["label_prioridade"].configure(text=prioridade, fg=cor_prioridade)
+        slot["label_tarefa"].configure(text=f"Ticket {task_id}: {exibido[0]}", wraplength=max(50, largura - 30))
+        slot["exibido"] = exibido
+    posicao = (ESPACO_CARTAO + indice * (ALTURA_CARTAO + ESPACO_CARTAO), largura)
+    if slot["posicao"] != posicao:
+        canvas_tarefas.coords(slot["janela"], 5, posicao[0])
+        canvas_tarefas.itemconfigure(slot["janela"], width=max(50, largura - 10), height=ALTURA_CARTAO, state="normal")
+        slot["posicao"] = posicao
+    if slot["task_id"] != task_id:
+        if tarefas_widgets.get(slot["task_id"]) is slot:
+            del tarefas_widgets[slot["task_id"]]
+        slot["task_id"] = task_id
+    tarefas_widgets[task_id] = slot
+
+# Função para esconder um slot que saiu da área visível (fica disponível para reuso)
+def liberar_slot(slot):
+    if "itens" in slot:
+        slot["canvas"].itemconfigure(slot["tag"], state="hidden")
+    else:
+        slot["frame"].master.itemconfigure(slot["janela"], state="hidden")
+    if tarefas_widgets.get(slot["task_id"]) is slot:
+        del tarefas_widgets[slot["task_id"]]
+    slot["task_id"] = None
+    slot["posicao"] = None
+
+# Função para agrupar várias renderizações da mesma coluna em uma só (após eventos pendentes)
+def agendar_renderizacao(coluna):
+    if coluna.get("render_agendado"):
+        return
+    def executar():
+        coluna["render_agendado"] = None
+        renderizar_coluna(coluna)
+    coluna["render_agendado"] = janela.after_idle(executar)
+
+# Função para materializar apenas os cartões visíveis da coluna
+@instrumentar("renderizar_coluna")
+def renderizar_coluna(coluna):
+    try:
+        canvas_tarefas = coluna["canvas"]
+        if not canvas_tarefas.winfo_exists():
+            return
+        ids = coluna["ids"]
+        passo = ALTURA_CARTAO + ESPACO_CARTAO
+        largura = canvas_tarefas.winfo_width()
+        largura = largura if largura > 1 else 150
+        altura = canvas_tarefas.winfo_height()
+        altura = altura if altura > 1 else 600
+        canvas_tarefas.configure(scrollregion=(0, 0, largura, max(altura, ESPACO_CARTAO + len(ids) * passo)))
+
+        topo = canvas_tarefas.canvasy(0)
+        primeiro = max(0, int(topo // passo) - SOBRA_VIRTUALIZACAO)
+        ultimo = min(len(ids), int((topo + altura) // passo) + 1 + SOBRA_VIRTUALIZACAO)
+        visiveis = {ids[indice]: indice for indice in range(primeiro, ultimo)}
+
+        ocupados = {}
+        livres = []
+        for slot in coluna["slots"]:
+            if slot["task_id"] in visiveis and slot["task_id"] not in ocupados:
+                ocupados[slot["task_id"]] = slot
+            else:
+                livres.append(slot)
+        tarefas = _quadro_em_cache if _quadro_em_cache is not None else obter_tarefas()
+        for task_id, indice in visiveis.items():
+            if not (ocupados.get(task_id) or livres):
+                livres.append(criar_slot_desenhado(coluna) if coluna["desenhado"] else criar_slot_cartao(coluna))
+            slot = ocupados.get(task_id) or livres.pop()
+            preencher_slot(slot, task_id, tarefas.get(task_id, {}), indice, largura)
+        for slot in livres:
+            if slot["task_id"] is not None:
+                liberar_slot(slot)
     except Exception as e:
-        print(f"[ERROR] Erro ao criar widget da tarefa {task_id}: {e}")
+        print(f"[ERROR] Erro ao renderizar coluna {coluna.get('estado')}: {e}")
 
 # Função para atualizar tarefas
+# Reconciliação por diferença: só as tarefas marcadas como alteradas no repositório são
+# comparadas com o que foi renderizado; cartões mudam de coluna sem recriar nada e apenas
+# as colunas afetadas são redesenhadas (e, nelas, só os cartões visíveis)
+@instrumentar("atualizar_tarefas")
 def atualizar_tarefas():
-    global layout_lock
+    global layout_lock, _render_completo, _quadro_em_cache
     if layout_lock:
         return
+    if _quadro_em_cache is not None and _tarefas_memoria is None:
+        # Inicialização rápida: o quadro em cache fica na tela até a carga em segundo plano terminar
+        return
     layout_lock = True
     try:
-        tarefas = carregar_tarefas()
-        widgets_existentes = set(tarefas_widgets.keys())
-        tarefas_atuais = set(tarefas.keys())
-
-        for task_id in widgets_existentes - tarefas_atuais:
-            if task_id in tarefas_widgets:
-                frame = tarefas_widgets[task_id].get("frame")
-                if frame and frame.winfo_exists():
-                    frame.destroy()
-                del tarefas_widgets[task_id]
-
-        for task_id, task in tarefas.items():
-            estado = task.get("estado", "To Do")
-            if estado not in colunas or not colunas[estado]["frame"].winfo_exists():
-                continue
-            if task_id not in tarefas_widgets:
-                criar_widget_tarefa(task_id, task, colunas[estado]["frame"])
-            else:
-                widget_info = tarefas_widgets[task_id]
-                frame = widget_info.get("frame")
-                label_tarefa = widget_info.get("label_tarefa")
-                label_prioridade = widget_info.get("label_prioridade")
-
-                if not (frame and frame.winfo_exists() and label_tarefa and label_tarefa.winfo_exists() and
-                        label_prioridade and label_prioridade.winfo_exists()):
-                    if frame and frame.winfo_exists():
-                        frame.destroy()
-                    del tarefas_widgets[task_id]
-                    criar_widget_tarefa(task_id, task, colunas[estado]["frame"])
-                    continue
-
-                coluna_width = colunas[estado]["canvas"].winfo_width() or 75
-                label_tarefa.configure(
-                    text=f"Ticket {task_id}: {task.get('titulo', 'Sem título')}",
-                    wraplength=max(50, coluna_width - 30)
-                )
-                prioridade = task.get("prioridade", "Média")
-                cor_prioridade = {"Alta": "#ff4d4d", "Média": "#ffcc00", "Baixa": "#00cc00"}.get(prioridade, "#ffcc00")
-                label_prioridade.configure(text=prioridade, fg=cor_prioridade)
-                if frame.master != colunas[estado]["frame"] and colunas[estado]["frame"].winfo_exists():
-                    frame.pack_forget()
-                    try:
-                        frame.pack(in_=colunas[estado]["frame"], fill=tk.X, padx=5, pady=2)
-                    except tk.TclError as e:
-                        print(f"[WARNING] Falha ao empacotar tarefa {task_id}: {e}")
-                        frame.destroy()
-                        del tarefas_widgets[task_id]
-                        criar_widget_tarefa(task_id, task, colunas[estado]["frame"])
+        if _quadro_em_cache is not None:
+            _quadro_em_cache = None
+            _render_completo = True
+        tarefas = obter_tarefas()
+        with _lock_tarefas:
+            completo = _render_completo
+            alteradas = set(_ids_para_render)
+            _render_completo = False
+            _ids_para_render.clear()
+
+        if completo:
+            reconstruir_colunas(copiar_tarefas())
+            afetadas = list(colunas.values())
+        else:
+            afetadas = reconciliar_tarefas(tarefas, alteradas)
 
-        atualizar_layout_colunas()
+        for coluna in afetadas:
+            if coluna["canvas"].winfo_exists():
+                renderizar_coluna(coluna)
+        if completo:
+            atualizar_layout_colunas()
     except Exception as e:
         print(f"[ERROR] Erro ao atualizar tarefas: {e}")
         texto_detalhes.delete("1.0", tk.END)
@@ -575,6 +2500,52 @@ def atualizar_tarefas():
     finally:
         layout_lock = False
 
+def resumo_render(task):
+    return task.get("estado", "To Do"), task.get("titulo", "Sem título"), task.get("prioridade", PRIORIDADE_PADRAO)
+
+# Função para montar do zero a lista de ids de cada coluna (inicialização, sincronização completa)
+def reconstruir_colunas(tarefas):
+    agrupadas = {estado: [] for estado in colunas}
+    _snapshot_render.clear()
+    encontrados = buscar_ids(_termos_filtro) if _termos_filtro else None
+    for task_id, task in tarefas.items():
+        # Com filtro ativo, o snapshot só guarda as tarefas exibidas
+        if encontrados is not None and task_id not in encontrados:
+            continue
+        resumo = resumo_render(task)
+        _snapshot_render[task_id] = resumo
+        if resumo[0] in agrupadas:
+            agrupadas[resumo[0]].append(task_id)
+    for estado, ids in agrupadas.items():
+        colunas[estado]["ids"] = ids
+
+# Função para aplicar às colunas só as diferenças das tarefas alteradas; retorna as colunas afetadas
+def reconciliar_tarefas(tarefas, alteradas):
+    afetadas = {}
+    for task_id in alteradas:
+        anterior = _snapshot_render.get(task_id)
+        task = tarefas.get(task_id)
+        if task is not None and _termos_filtro and not tarefa_corresponde(task_id, _termos_filtro):
+            task = None  # Deixou de corresponder à busca: sai do quadro como se tivesse sido removida
+        atual = resumo_render(task) if task is not None else None
+        if anterior == atual:
+            continue
+        estado_anterior = anterior[0] if anterior else None
+        estado_atual = atual[0] if atual else None
+        if estado_anterior != estado_atual:
+            if estado_anterior in colunas and task_id in colunas[estado_anterior]["ids"]:
+                colunas[estado_anterior]["ids"].remove(task_id)
+                afetadas[estado_anterior] = colunas[estado_anterior]
+            if estado_atual in colunas:
+                colunas[estado_atual]["ids"].append(task_id)
+        if estado_atual in colunas:
+            afetadas[estado_atual] = colunas[estado_atual]
+        if atual is None:
+            _snapshot_render.pop(task_id, None)
+        else:
+            _snapshot_render[task_id] = atual
+    return list(afetadas.values())
+
 # Função para editar cor da coluna
 def editar_cor_coluna(estado):
     cor_escolhida = colorchooser.askcolor(title=f"Escolher cor para {estado}")[1]
@@ -583,31 +2554,89 @@ def editar_cor_coluna(estado):
         salvar_configuracoes(GOOGLE_SHEETS_URL, estados, CORES_COLUNAS)
         colunas[estado]["frame_coluna"].configure(bg=cor_escolhida)
         colunas[estado]["canvas"].configure(bg=cor_escolhida)
-        colunas[estado]["frame"].configure(bg=cor_escolhida)
-        colunas[estado]["canvas"].delete("bg_rect", "corner")
-        coluna_width = colunas[estado]["canvas"].winfo_width() or 75
-        raio = 20
-        colunas[estado]["canvas"].create_rectangle(raio, 2, coluna_width - raio,
-                                                  colunas[estado]["canvas"].winfo_height() - 2,
-                                                  fill=cor_escolhida, outline="", tags="bg_rect")
-        colunas[estado]["canvas"].create_rectangle(2, raio, coluna_width - 2,
-                                                  colunas[estado]["canvas"].winfo_height() - raio,
-                                                  fill=cor_escolhida, outline="", tags="bg_rect")
-        for x, y in [(2, 2), (coluna_width - 2 * raio - 2, 2),
-                     (2, colunas[estado]["canvas"].winfo_height() - 2 * raio - 2),
-                     (coluna_width - 2 * raio - 2, colunas[estado]["canvas"].winfo_height() - 2 * raio - 2)]:
-            colunas[estado]["canvas"].create_oval(x, y, x + 2 * raio, y + 2 * raio, fill=cor_escolhida, outline="",
-                                                 tags="corner")
-        colunas[estado]["canvas"].lower("bg_rect", "corner")
+        canvas = colunas[estado]["canvas"]
+        desenhar_fundo_coluna(colunas[estado], canvas.winfo_width() or 75, canvas.winfo_height())
         messagebox.showinfo("Cor Alterada", f"Cor da coluna '{estado}' alterada para {cor_escolhida}.")
         atualizar_layout_colunas()
 
+# Funções de seleção múltipla: só os cartões visíveis das colunas afetadas são redesenhados
+def redesenhar_selecao(ids):
+    afetadas = {_snapshot_render[task_id][0] for task_id in ids if task_id in _snapshot_render}
+    for estado in afetadas:
+        if estado in colunas:
+            agendar_renderizacao(colunas[estado])
+    atualizar_barra_selecao()
+
+def alternar_selecao(task_id):
+    if task_id is None:
+        return
+    if task_id in tarefas_selecionadas:
+        tarefas_selecionadas.discard(task_id)
+    else:
+        tarefas_selecionadas.add(task_id)
+    redesenhar_selecao([task_id])
+
+def selecionar_coluna(coluna):
+    tarefas_selecionadas.update(coluna["ids"])
+    redesenhar_selecao(coluna["ids"])
+
+def limpar_selecao(event=None):
+    ids = list(tarefas_selecionadas)
+    tarefas_selecionadas.clear()
+    redesenhar_selecao(ids)
+
+# Função para aplicar uma ação em lote: uma gravação, uma reconciliação do quadro e um envio
+def aplicar_em_lote(alteradas=None, removidas=(), mensagem=""):
+    salvar_alteracoes_tarefas(alteradas=alteradas, removidas=removidas)
+    limpar_selecao()
+    atualizar_tarefas()
+    agendar_envio()
+    listar_tarefas_em_execucao()
+    texto_detalhes.insert(tk.END, f"{mensagem}\n", "info")
+
+def mover_selecionadas(estado):
+    tarefas = obter_tarefas()
+    alteradas = {task_id: dict(tarefas[task_id], estado=estado) for task_id in tarefas_selecionadas
+                 if task_id in tarefas and tarefas[task_id].get("estado") != estado}
+    if not alteradas:
+        return False
+    aplicar_em_lote(alteradas=alteradas, mensagem=f"{len(alteradas)} tarefa(s) movida(s) para '{estado}'.")
+    return True
+
+def definir_prioridade_selecionadas(prioridade):
+    tarefas = obter_tarefas()
+    alteradas = {task_id: dict(tarefas[task_id], prioridade=prioridade) for task_id in tarefas_selecionadas
+                 if task_id in tarefas and tarefas[task_id].get("prioridade") != prioridade}
+    if alteradas:
+        aplicar_em_lote(alteradas=alteradas, mensagem=f"Prioridade '{prioridade}' aplicada a {len(alteradas)} tarefa(s).")
+
+def excluir_selecionadas():
+    tarefas = obter_tarefas()
+    removidas = [task_id for task_id in tarefas_selecionadas if task_id in tarefas]
+    if removidas and messagebox.askyesno("Excluir Tarefas", f"Excluir {len(removidas)} tarefa(s) selecionada(s)?"):
+        aplicar_em_lote(removidas=removidas, mensagem=f"{len(removidas)} tarefa(s) excluída(s).")
+
+# Função para abrir um menu de opções junto ao botão da barra de seleção
+def abrir_menu_lote(botao, opcoes, acao):
+    menu = tk.Menu(janela, tearoff=0)
+    for opcao in opcoes:
+        menu.add_command(label=opcao, command=lambda valor=opcao: acao(valor))
+    menu.post(botao.winfo_rootx(), botao.winfo_rooty() + botao.winfo_height())
+
+def atualizar_barra_selecao():
+    if tarefas_selecionadas:
+        label_selecao.configure(text=f"{len(tarefas_selecionadas)} selecionada(s)")
+        if not frame_selecao.winfo_ismapped():
+            frame_selecao.pack(side=tk.RIGHT)
+    elif frame_selecao.winfo_ismapped():
+        frame_selecao.pack_forget()
+
 # Funções para arrastar e soltar tarefas
 def iniciar_arrasto(event, task_id):
     global arrastando, tarefa_arrastada, widget_fantasma
     try:
         arrastando = task_id
-        tarefa_arrastada = tarefas_widgets.get(task_id, {}).get("frame")
+        tarefa_arrastada = tarefas_widgets.get(task_id)
         if tarefa_arrastada:
             widget_fantasma = tk.Label(janela, text=f"Ticket {task_id}", bg="#555555", fg="#ffffff", font=("Arial", 10))
             widget_fantasma.place(x=event.x_root - janela.winfo_rootx(), y=event.y_root - janela.winfo_rooty())
@@ -627,6 +2656,7 @@ def arrastar_tarefa(event):
     except Exception as e:
         print(f"[ERROR] Erro ao arrastar tarefa: {e}")
 
+@instrumentar("soltar_tarefa")
 def soltar_tarefa(event, task_id):
     global arrastando, tarefa_arrastada, widget_fantasma
     try:
@@ -643,22 +2673,19 @@ def soltar_tarefa(event, task_id):
             canvas_w = canvas.winfo_width()
             canvas_h = canvas.winfo_height()
             if canvas_x <= x <= canvas_x + canvas_w and canvas_y <= y <= canvas_y + canvas_h:
-                tarefas = carregar_tarefas()
-                if task_id in tarefas and tarefas[task_id].get("estado") != estado:
-                    tarefas[task_id]["estado"] = estado
-                    salvar_tarefas(tarefas)
-                    if task_id in tarefas_widgets:
-                        frame = tarefas_widgets[task_id].get("frame")
-                        if frame and frame.winfo_exists():
-                            frame.destroy()
-                        del tarefas_widgets[task_id]
-                    if coluna["frame"].winfo_exists():
-                        criar_widget_tarefa(task_id, tarefas[task_id], coluna["frame"])
-                    atualizar_layout_colunas()
+                if task_id in tarefas_selecionadas and len(tarefas_selecionadas) > 1:
+                    # Arrastar um cartão selecionado leva toda a seleção
+                    tarefa_movida = mover_selecionadas(estado)
+                    break
+                task = obter_tarefa(task_id)
+                if task is not None and task.get("estado") != estado:
+                    task = dict(task, estado=estado)
+                    definir_tarefa(task_id, task)
+                    atualizar_tarefas()
                     texto_detalhes.delete("1.0", tk.END)
                     texto_detalhes.insert(tk.END, f"Tarefa {task_id} movida para '{estado}'.\n", "info")
                     tarefa_movida = True
-                    enviar_tarefas_planilha()
+                    agendar_envio()
                     listar_tarefas_em_execucao()
                 break
         if not tarefa_movida:
@@ -726,7 +2753,7 @@ def soltar_coluna(event, estado):
             texto_detalhes.delete("1.0", tk.END)
             texto_detalhes.insert(tk.END, f"Coluna '{estado}' movida para a posição de '{nova_posicao}'.\n", "info")
             # Sync with Google Sheets
-            enviar_tarefas_planilha()
+            agendar_envio()
     except Exception as e:
         print(f"[ERROR] Erro ao soltar coluna {estado}: {e}")
         texto_detalhes.delete("1.0", tk.END)
@@ -787,12 +2814,7 @@ def reordenar_colunas_post_animation():
         return
     layout_lock = True
     try:
-        # Repack columns in the correct order
-        for estado in colunas:
-            colunas[estado]["frame_coluna"].pack_forget()
-        for estado in estados:
-            if estado in colunas and colunas[estado]["frame_coluna"].winfo_exists():
-                colunas[estado]["frame_coluna"].pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        reempacotar_colunas()
         atualizar_layout_colunas()
     except Exception as e:
         print(f"[ERROR] Erro ao reordenar colunas: {e}")
@@ -801,73 +2823,82 @@ def reordenar_colunas_post_animation():
     finally:
         layout_lock = False
 
-# Modified reordenar_colunas to avoid destroying widgets
-def reordenar_colunas():
-    global layout_lock
-    if layout_lock:
-        return
-    layout_lock = True
-    try:
-        # Only animate if called from soltar_coluna; otherwise, just update layout
-        for estado in estados:
-            if estado not in colunas:
-                criar_coluna(estado)
-        atualizar_layout_colunas()
-    except Exception as e:
-        print(f"[ERROR] Erro ao reordenar colunas: {e}")
-        texto_detalhes.delete("1.0", tk.END)
-        texto_detalhes.insert(tk.END, f"⚠️ Erro ao reordenar colunas: {e}\n", "info")
-    finally:
-        layout_lock = False
+# Função para reempacotar os frames das colunas na ordem de estados
+def reempacotar_colunas():
+    for estado in colunas:
+        colunas[estado]["frame_coluna"].pack_forget()
+    for estado in estados:
+        if estado in colunas and colunas[estado]["frame_coluna"].winfo_exists():
+            colunas[estado]["frame_coluna"].pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
 
 # Função para reordenar colunas
-def reordenar_colunas():
+# Incremental: cria só as colunas novas, destrói só as removidas, troca o rótulo das
+# renomeadas (renomeadas: {nome_antigo: nome_novo}) e reempacota na ordem de estados,
+# preservando os cartões já materializados das demais
+@instrumentar("reordenar_colunas")
+def reordenar_colunas(renomeadas=None):
     global layout_lock
     if layout_lock:
         return
     layout_lock = True
     try:
-        for task_id, widget_info in list(tarefas_widgets.items()):
-            frame = widget_info.get("frame")
-            if frame and frame.winfo_exists():
-                frame.destroy()
-            del tarefas_widgets[task_id]
-
-        for estado in list(colunas.keys()):
-            frame = colunas[estado]["frame_coluna"]
-            if frame and frame.winfo_exists():
-                frame.destroy()
-            del colunas[estado]
-
-        for estado in estados:
-            criar_coluna(estado)
-
-        tarefas = carregar_tarefas()
-        for task_id, task in tarefas.items():
-            estado = task.get("estado", "To Do")
-            if estado in colunas and colunas[estado]["frame"].winfo_exists():
-                criar_widget_tarefa(task_id, task, colunas[estado]["frame"])
-
+        for antigo, novo in (renomeadas or {}).items():
+            if antigo not in colunas or novo in colunas:
+                continue
+            coluna = colunas.pop(antigo)
+            coluna["estado"] = novo
+            coluna["label"].configure(text=novo)
+            colunas[novo] = coluna
+            # As tarefas da coluna continuam nela; só o estado registrado na última renderização muda
+            for task_id in coluna["ids"]:
+                if task_id in _snapshot_render:
+                    _snapshot_render[task_id] = (novo,) + _snapshot_render[task_id][1:]
+
+        for estado in [e for e in colunas if e not in estados]:
+            coluna = colunas.pop(estado)
+            for slot in coluna["slots"]:
+                if tarefas_widgets.get(slot["task_id"]) is slot:
+                    del tarefas_widgets[slot["task_id"]]
+            if coluna["frame_coluna"].winfo_exists():
+                coluna["frame_coluna"].destroy()
+
+        novos = [estado for estado in estados if estado not in colunas]
+        altura = altura_disponivel_colunas() if novos else None
+        for estado in novos:
+            criar_coluna(estado, altura)
+
+        reempacotar_colunas()
         janela.update_idletasks()
-        atualizar_layout_colunas()
     except Exception as e:
         print(f"[ERROR] Erro ao reordenar colunas: {e}")
         texto_detalhes.delete("1.0", tk.END)
         texto_detalhes.insert(tk.END, f"⚠️ Erro ao reordenar colunas: {e}\n", "info")
     finally:
         layout_lock = False
+    atualizar_layout_colunas()
+    atualizar_tarefas()
 
 # Função para mostrar detalhes da tarefa
 def mostrar_detalhes(task_id):
     try:
-        tarefas = carregar_tarefas()
-        if task_id in tarefas:
-            task = tarefas[task_id]
+        task = obter_tarefa(task_id)
+        if task is not None:
+            baixar = descricao_remota_pendente(task_id)
+            descricao = obter_descricao(task_id, buscar_remota=False)
+            if baixar:
+                descricao = "carregando..."
+                # A descrição só existe na planilha: baixada fora da thread da interface
+                def baixar_descricao():
+                    if obter_descricao(task_id) is not None:
+                        janela.after(0, lambda: mostrar_detalhes(task_id))
+                    else:
+                        janela.after(0, lambda: texto_detalhes.insert(tk.END, "⚠️ Descrição indisponível (sem conexão com a planilha).\n", "info"))
+                threading.Thread(target=baixar_descricao, daemon=True).start()
             texto_detalhes.delete("1.0", tk.END)
             texto_detalhes.insert(tk.END, f"Ticket {task_id}: {task.get('titulo', 'Sem título')}\n", "titulo")
             texto_detalhes.insert(tk.END, f"Estado: {task.get('estado', 'Desconhecido')}\n", "info")
             texto_detalhes.insert(tk.END, f"Prioridade: {task.get('prioridade', 'Média')}\n", "info")
-            texto_detalhes.insert(tk.END, f"Descrição: {task.get('descricao', 'Sem descrição')}\n", "item")
+            texto_detalhes.insert(tk.END, f"Descrição: {descricao if descricao is not None else 'Sem descrição'}\n", "item")
             texto_detalhes.insert(tk.END, f"Criado em: {task.get('data_criacao', 'Desconhecido')}\n", "item")
     except Exception as e:
         print(f"[ERROR] Erro ao mostrar detalhes da tarefa {task_id}: {e}")
@@ -884,18 +2915,16 @@ def adicionar_tarefa():
         if not titulo or not estado:
             messagebox.showwarning("Campos Obrigatórios", "Título e estado são obrigatórios.")
             return
-        tarefas = carregar_tarefas()
-        task_id = str(len(tarefas) + 1)
+        task_id = novo_id_tarefa()
         task = {
             "titulo": titulo,
             "descricao": descricao,
             "estado": estado,
             "prioridade": prioridade,
-            "data_criacao": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "data_criacao": datetime.now().strftime(FORMATO_DATA)
         }
-        tarefas[task_id] = task
-        salvar_tarefas(tarefas)
-        enviar_tarefas_planilha()
+        definir_tarefa(task_id, task)
+        agendar_envio()
         atualizar_tarefas()
         janela_tarefa.destroy()
         messagebox.showinfo("Tarefa Adicionada", f"Tarefa '{titulo}' adicionada com sucesso.")
@@ -920,8 +2949,8 @@ def adicionar_tarefa():
     combo_estado.pack(pady=5, fill=tk.X, padx=10)
 
     tk.Label(janela_tarefa, text="Prioridade:", bg="#2e2e2e", fg="#ffffff").pack(pady=5)
-    combo_prioridade = ttk.Combobox(janela_tarefa, values=["Alta", "Média", "Baixa"], state="readonly")
-    combo_prioridade.set("Média")
+    combo_prioridade = ttk.Combobox(janela_tarefa, values=list(PRIORIDADES), state="readonly")
+    combo_prioridade.set(PRIORIDADE_PADRAO)
     combo_prioridade.pack(pady=5, fill=tk.X, padx=10)
 
     btn_salvar = tk.Button(janela_tarefa, text="Salvar", command=salvar_nova_tarefa, bg="#007acc", fg="#ffffff", relief="flat")
@@ -930,11 +2959,10 @@ def adicionar_tarefa():
 # Função para editar tarefa
 def editar_tarefa(task_id):
     try:
-        tarefas = carregar_tarefas()
-        if task_id not in tarefas:
+        task = obter_tarefa(task_id)
+        if task is None:
             messagebox.showerror("Erro", f"Tarefa {task_id} não encontrada.")
             return
-        task = tarefas[task_id]
 
         def salvar_tarefa_editada():
             titulo = entry_titulo.get()
@@ -944,15 +2972,19 @@ def editar_tarefa(task_id):
             if not titulo or not estado:
                 messagebox.showwarning("Campos Obrigatórios", "Título e estado são obrigatórios.")
                 return
-            tarefas[task_id] = {
+            editada = {
                 "titulo": titulo,
                 "descricao": descricao,
                 "estado": estado,
                 "prioridade": prioridade,
-                "data_criacao": task.get("data_criacao", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                "data_criacao": task.get("data_criacao", datetime.now().strftime(FORMATO_DATA))
             }
-            salvar_tarefas(tarefas)
-            enviar_tarefas_planilha()
+            if not descricao_carregada[0]:
+                # Descrição ainda não baixada: fica a da planilha
+                editada.pop("descricao")
+                editada["descricao_hash"] = task["descricao_hash"]
+            definir_tarefa(task_id, editada)
+            agendar_envio()
             atualizar_tarefas()
             janela_tarefa.destroy()
             messagebox.showinfo("Tarefa Atualizada", f"Tarefa '{titulo}' atualizada com sucesso.")
@@ -970,7 +3002,25 @@ def editar_tarefa(task_id):
 
         tk.Label(janela_tarefa, text="Descrição:", bg="#2e2e2e", fg="#ffffff").pack(pady=5)
         texto_descricao = Text(janela_tarefa, height=5, bg="#333333", fg="#ffffff")
-        texto_descricao.insert("1.0", task.get("descricao", ""))
+        descricao_carregada = [not descricao_remota_pendente(task_id)]
+        if descricao_carregada[0]:
+            texto_descricao.insert("1.0", obter_descricao(task_id, buscar_remota=False) or "")
+        else:
+            texto_descricao.insert("1.0", "carregando...")
+            texto_descricao.configure(state="disabled")
+
+            def preencher_descricao(descricao):
+                if descricao is None or not texto_descricao.winfo_exists():
+                    return
+                texto_descricao.configure(state="normal")
+                texto_descricao.delete("1.0", tk.END)
+                texto_descricao.insert("1.0", descricao)
+                descricao_carregada[0] = True
+
+            def baixar_descricao():
+                descricao = obter_descricao(task_id)
+                janela.after(0, lambda: preencher_descricao(descricao))
+            threading.Thread(target=baixar_descricao, daemon=True).start()
         texto_descricao.pack(pady=5, fill=tk.X, padx=10)
 
         tk.Label(janela_tarefa, text="Estado:", bg="#2e2e2e", fg="#ffffff").pack(pady=5)
@@ -979,8 +3029,8 @@ def editar_tarefa(task_id):
         combo_estado.pack(pady=5, fill=tk.X, padx=10)
 
         tk.Label(janela_tarefa, text="Prioridade:", bg="#2e2e2e", fg="#ffffff").pack(pady=5)
-        combo_prioridade = ttk.Combobox(janela_tarefa, values=["Alta", "Média", "Baixa"], state="readonly")
-        combo_prioridade.set(task.get("prioridade", "Média"))
+        combo_prioridade = ttk.Combobox(janela_tarefa, values=list(PRIORIDADES), state="readonly")
+        combo_prioridade.set(task.get("prioridade", PRIORIDADE_PADRAO))
         combo_prioridade.pack(pady=5, fill=tk.X, padx=10)
 
         btn_salvar = tk.Button(janela_tarefa, text="Salvar", command=salvar_tarefa_editada, bg="#007acc", fg="#ffffff", relief="flat")
@@ -993,11 +3043,9 @@ def editar_tarefa(task_id):
 def excluir_tarefa(task_id):
     try:
         if messagebox.askyesno("Confirmar Exclusão", f"Deseja excluir a tarefa {task_id}?"):
-            tarefas = carregar_tarefas()
-            if task_id in tarefas:
-                del tarefas[task_id]
-                salvar_tarefas(tarefas)
-                enviar_tarefas_planilha()
+            if obter_tarefa(task_id) is not None:
+                remover_tarefa(task_id)
+                agendar_envio()
                 atualizar_tarefas()
                 messagebox.showinfo("Tarefa Excluída", f"Tarefa {task_id} excluída com sucesso.")
                 listar_tarefas_em_execucao()
@@ -1009,6 +3057,7 @@ def excluir_tarefa(task_id):
 
 # Função para carregar ícone
 def carregar_icone_janela():
+    from PIL import Image, ImageTk
     base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
     print(f"[DEBUG] Base path for icon: {base_path}")
     icon_path = os.path.join(base_path, 'image', 'icone.ico')
@@ -1023,6 +3072,8 @@ def carregar_icone_janela():
 
 # Função para criar ícone da bandeja
 def create_icon():
+    from pystray import Icon, MenuItem, Menu
+    from PIL import Image
     base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
     print(f"[DEBUG] Base path for icon: {base_path}")
     icon_path = os.path.join(base_path, 'image', 'icone.ico')
@@ -1041,6 +3092,25 @@ def create_icon():
     ))
     return icon
 
+# Função para desenhar o fundo arredondado da coluna; só recria os itens se tamanho ou cor mudaram
+def desenhar_fundo_coluna(coluna, largura, altura):
+    canvas = coluna["canvas"]
+    cor_coluna = obter_cor_coluna(coluna["estado"])
+    tamanho = (largura, altura, cor_coluna)
+    if coluna.get("tamanho_fundo") == tamanho:
+        return
+    coluna["tamanho_fundo"] = tamanho
+    raio = 20
+    canvas.delete("bg_rect", "corner")
+    canvas.create_rectangle(raio, 2, largura - raio, altura - 2, fill=cor_coluna, outline="", tags="bg_rect")
+    canvas.create_rectangle(2, raio, largura - 2, altura - raio, fill=cor_coluna, outline="", tags="bg_rect")
+    for x, y in [(2, 2), (largura - 2 * raio - 2, 2),
+                 (2, altura - 2 * raio - 2),
+                 (largura - 2 * raio - 2, altura - 2 * raio - 2)]:
+        canvas.create_oval(x, y, x + 2 * raio, y + 2 * raio, fill=cor_coluna, outline="", tags="corner")
+    canvas.lower("bg_rect", "corner")
+    canvas.tag_raise("cartao")
+
 # Função para atualizar o layout das colunas
 def atualizar_layout_colunas(event=None):
     global resize_timer, layout_lock
@@ -1050,6 +3120,7 @@ def atualizar_layout_colunas(event=None):
         janela.after_cancel(resize_timer)
     resize_timer = janela.after(300, lambda: _atualizar_layout_colunas())
 
+@instrumentar("atualizar_layout_colunas")
 def _atualizar_layout_colunas():
     global layout_lock
     if layout_lock:
@@ -1077,36 +3148,14 @@ def _atualizar_layout_colunas():
             frame_coluna = coluna["frame_coluna"]
             if not (canvas.winfo_exists() and frame_coluna.winfo_exists()):
                 continue
-            frame_coluna.configure(width=coluna_width)
-            canvas.configure(width=coluna_width, height=available_height)
-            frame_coluna.pack_forget()
-            frame_coluna.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
-
-            cor_coluna = obter_cor_coluna(estado)
-            raio = 20
-
-            canvas.delete("bg_rect", "corner")
-            canvas.create_rectangle(raio, 2, coluna_width - raio, available_height - 2,
-                                   fill=cor_coluna, outline="", tags="bg_rect")
-            canvas.create_rectangle(2, raio, coluna_width - 2, available_height - raio,
-                                   fill=cor_coluna, outline="", tags="bg_rect")
-            for x, y in [(2, 2), (coluna_width - 2 * raio - 2, 2),
-                         (2, available_height - 2 * raio - 2),
-                         (coluna_width - 2 * raio - 2, available_height - 2 * raio - 2)]:
-                canvas.create_oval(x, y, x + 2 * raio, y + 2 * raio,
-                                  fill=cor_coluna, outline="", tags="corner")
-            canvas.lower("bg_rect", "corner")
-
-            canvas.configure(scrollregion=canvas.bbox("all"))
-
-            for widget in coluna["frame"].winfo_children():
-                if not widget.winfo_exists():
-                    continue
-                for task_id, task_info in tarefas_widgets.items():
-                    if task_info["frame"] == widget:
-                        label_tarefa = task_info.get("label_tarefa")
-                        if label_tarefa and label_tarefa.winfo_exists():
-                            label_tarefa.configure(wraplength=max(50, coluna_width - 30))
+            if coluna["tamanho_fundo"] is None or coluna["tamanho_fundo"][:2] != (coluna_width, available_height):
+                frame_coluna.configure(width=coluna_width)
+                canvas.configure(width=coluna_width, height=available_height)
+                desenhar_fundo_coluna(coluna, coluna_width, available_height)
+
+            # Reposiciona e ajusta a quebra de linha apenas dos cartões materializados; as
+            # renderizações de todas as colunas são agrupadas em um único ciclo ocioso
+            agendar_renderizacao(coluna)
 
             total_width += coluna_width + 10
 
@@ -1126,15 +3175,69 @@ def _atualizar_layout_colunas():
     finally:
         layout_lock = False
 
+# Função da barra de busca: filtra o quadro no lugar (espera uma pausa na digitação)
+_busca_agendada = None
+
+def agendar_filtro(*args):
+    global _busca_agendada
+    if _busca_agendada:
+        janela.after_cancel(_busca_agendada)
+    _busca_agendada = janela.after(150, lambda: aplicar_filtro(var_busca.get()))
+
+def aplicar_filtro(consulta):
+    global _termos_filtro, _render_completo, _busca_agendada
+    _busca_agendada = None
+    termos = termos_busca(consulta) or None
+    if termos == _termos_filtro:
+        return
+    _termos_filtro = termos
+    _render_completo = True
+    atualizar_tarefas()
+    if termos:
+        label_resultado_busca.configure(text=f"{len(_snapshot_render)} tarefa(s)")
+    else:
+        label_resultado_busca.configure(text="")
+
+def preparar_indice_busca(event=None):
+    if _indice_busca is None and _tarefas_memoria is not None:
+        threading.Thread(target=garantir_indice_busca, daemon=True).start()
+
+# Painel de desempenho (opcional, ao lado de texto_detalhes): p50/p95 das operações medidas,
+# cartões materializados e bytes sincronizados, atualizado a cada segundo enquanto visível
+painel_visivel = False
+
+def alternar_painel_desempenho():
+    global painel_visivel
+    painel_visivel = not painel_visivel
+    if painel_visivel:
+        painel_desempenho.pack(side=tk.RIGHT, fill=tk.Y, padx=5, pady=5)
+        atualizar_painel_desempenho()
+    else:
+        painel_desempenho.pack_forget()
+
+def atualizar_painel_desempenho():
+    if not painel_visivel:
+        return
+    tempos, contadores = resumo_metricas()
+    linhas = [f"{'operação':<26}{'n':>5}{'p50':>9}{'p95':>9}"]
+    for nome in sorted(tempos):
+        t = tempos[nome]
+        linhas.append(f"{nome:<26}{t['n']:>5}{t['p50']:>9.1f}{t['p95']:>9.1f}")
+    slots = sum(len(coluna["slots"]) for coluna in colunas.values())
+    linhas.append("")
+    linhas.append(f"tarefas: {len(_snapshot_render)}  cartões visíveis: {len(tarefas_widgets)}  slots: {slots}")
+    linhas.append(f"enviados: {contadores.get('bytes_enviados', 0) / 1024:.1f} KiB  "
+                  f"recebidos: {contadores.get('bytes_recebidos', 0) / 1024:.1f} KiB")
+    painel_desempenho.configure(text="\n".join(linhas))
+    janela.after(1000, atualizar_painel_desempenho)
+
 # Configuração da janela principal (unchanged)
 janela = tk.Tk()
 janela.title("Gerenciador de Tarefas - Kanban")
 janela.geometry("1200x600")
 janela.configure(bg="#2e2e2e")
 janela.minsize(800, 400)
-icone_janela = carregar_icone_janela()
-if icone_janela:
-    janela.iconphoto(True, icone_janela)
+icone_janela = None  # Carregado após a primeira tela (aplicar_icone_janela)
 cor_fundo = "#1e1e1e"
 cor_texto = "#ffffff"
 cor_lista = "#333333"
@@ -1167,8 +3270,41 @@ btn_alterar_url_lateral.pack(fill=tk.X, padx=10, pady=5)
 btn_novo_estado_lateral = tk.Button(frame_lateral, text="Novo Estado", command=adicionar_estado, bg=cor_config,
                                     fg=cor_texto, relief="flat")
 btn_novo_estado_lateral.pack(fill=tk.X, padx=10, pady=5)
+btn_desempenho_lateral = tk.Button(frame_lateral, text="Desempenho", command=alternar_painel_desempenho, bg=cor_config,
+                                   fg=cor_texto, relief="flat")
+btn_desempenho_lateral.pack(fill=tk.X, padx=10, pady=5)
+label_fila_saida = tk.Label(frame_lateral, text="", bg="#252525", fg="#aaaaaa", font=("Arial", 9), wraplength=180,
+                            justify=tk.LEFT)
+label_fila_saida.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=10)
 frame_conteudo = tk.Frame(frame_principal, bg="#2e2e2e")
 frame_conteudo.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+frame_busca = tk.Frame(frame_conteudo, bg="#2e2e2e")
+frame_busca.pack(fill=tk.X, padx=5, pady=(10, 0))
+tk.Label(frame_busca, text="Buscar:", bg="#2e2e2e", fg=cor_texto, font=("Arial", 10)).pack(side=tk.LEFT)
+var_busca = tk.StringVar()
+entrada_busca = tk.Entry(frame_busca, textvariable=var_busca, bg=cor_lista, fg=cor_texto, insertbackground=cor_texto,
+                         relief="flat")
+entrada_busca.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+label_resultado_busca = tk.Label(frame_busca, text="", bg="#2e2e2e", fg="#aaaaaa", font=("Arial", 9, "italic"))
+label_resultado_busca.pack(side=tk.LEFT)
+var_busca.trace_add("write", agendar_filtro)
+frame_selecao = tk.Frame(frame_busca, bg="#2e2e2e")
+label_selecao = tk.Label(frame_selecao, text="", bg="#2e2e2e", fg=cor_texto, font=("Arial", 9, "bold"))
+label_selecao.pack(side=tk.LEFT, padx=5)
+btn_mover_lote = tk.Button(frame_selecao, text="Mover para ▾", bg=cor_destaque, fg=cor_texto, relief="flat")
+btn_mover_lote.configure(command=lambda: abrir_menu_lote(btn_mover_lote, estados, mover_selecionadas))
+btn_mover_lote.pack(side=tk.LEFT, padx=2)
+btn_prioridade_lote = tk.Button(frame_selecao, text="Prioridade ▾", bg=cor_destaque, fg=cor_texto, relief="flat")
+btn_prioridade_lote.configure(command=lambda: abrir_menu_lote(btn_prioridade_lote, list(PRIORIDADES),
+                                                              definir_prioridade_selecionadas))
+btn_prioridade_lote.pack(side=tk.LEFT, padx=2)
+tk.Button(frame_selecao, text="Excluir", command=excluir_selecionadas, bg="#ff4d4d", fg=cor_texto,
+          relief="flat").pack(side=tk.LEFT, padx=2)
+tk.Button(frame_selecao, text="Limpar", command=limpar_selecao, bg=cor_lista, fg=cor_texto,
+          relief="flat").pack(side=tk.LEFT, padx=2)
+janela.bind("<Escape>", limpar_selecao)
+entrada_busca.bind("<FocusIn>", preparar_indice_busca)
+entrada_busca.bind("<Escape>", lambda e: var_busca.set(""))
 frame_kanban = tk.Frame(frame_conteudo, bg="#2e2e2e")
 frame_kanban.pack(fill=tk.BOTH, expand=True, pady=10)
 frame_kanban_canvas = tk.Canvas(frame_kanban, bg="#2e2e2e", highlightthickness=0)
@@ -1218,19 +3354,128 @@ texto_detalhes.tag_configure("titulo", font=("Arial", 12, "bold"))
 texto_detalhes.tag_configure("subtitulo", font=("Arial", 10, "bold"))
 texto_detalhes.tag_configure("item", font=("Arial", 10))
 texto_detalhes.tag_configure("info", font=("Arial", 10, "italic"))
+painel_desempenho = tk.Label(frame_detalhes, bg=cor_lista, fg=cor_texto, font=("Courier", 9), justify=tk.LEFT,
+                             anchor="nw")
+
+# Funções de inicialização rápida: a primeira tela vem de um resumo do quadro salvo na
+# execução anterior; as tarefas completas são carregadas em segundo plano e substituem o resumo
+def salvar_cache_quadro(resumos=None):
+    try:
+        resumos = dict(_snapshot_render) if resumos is None else resumos
+        if not resumos and _tarefas_memoria is None:
+            return
+        garantir_diretorio_dados()
+        gravar_json_atomico(os.path.join(DATA_DIR, CACHE_QUADRO), {"estados": list(estados), "tarefas": resumos},
+                            separators=(",", ":"))
+    except Exception as e:
+        print(f"[ERROR] Erro ao salvar cache do quadro: {e}")
+
+def pintar_quadro_do_cache():
+    global _quadro_em_cache
+    cache_path = os.path.join(DATA_DIR, CACHE_QUADRO)
+    try:
+        if not os.path.exists(cache_path):
+            return False
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        tarefas = {task_id: {"estado": resumo[0], "titulo": resumo[1], "prioridade": resumo[2]}
+                   for task_id, resumo in cache.get("tarefas", {}).items()}
+    except (OSError, ValueError, TypeError, IndexError) as e:
+        print(f"[WARNING] Cache do quadro ignorado: {e}")
+        return False
+    _quadro_em_cache = tarefas
+    for estado, coluna in colunas.items():
+        coluna["ids"] = []
+    for task_id, task in tarefas.items():
+        if task["estado"] in colunas:
+            colunas[task["estado"]]["ids"].append(task_id)
+    for coluna in colunas.values():
+        renderizar_coluna(coluna)
+    print(f"[INFO] Primeira tela desenhada a partir do cache ({len(tarefas)} tarefas).")
+    return True
+
+def carregar_em_segundo_plano():
+    try:
+        obter_tarefas()
+    except Exception as e:
+        print(f"[ERROR] Erro ao carregar tarefas em segundo plano: {e}")
+    janela.after(0, concluir_inicializacao)
 
-# Função para inicializar a aplicação (unchanged)
+def concluir_inicializacao():
+    global _quadro_em_cache, _render_completo
+    _quadro_em_cache = None
+    _render_completo = True
+    atualizar_tarefas()
+    listar_tarefas_em_execucao()
+    marcar_tempo_inicializacao("carga_completa_ms")
+    threading.Thread(target=salvar_cache_quadro, args=(dict(_snapshot_render),), daemon=True).start()
+    sincronizar_com_planilha()
+    retomar_envio()
+    iniciar_auto_sincronizacao()
+
+def aplicar_icone_janela():
+    global icone_janela
+    icone_janela = carregar_icone_janela()
+    if icone_janela:
+        janela.iconphoto(True, icone_janela)
+
+# Medição da inicialização: tempos desde o início do processo, gravados em startup_times.jsonl
+# ("frio" = sem cache do quadro, "quente" = primeira tela a partir do cache)
+_tempos_inicializacao = {}
+
+def marcar_tempo_inicializacao(etapa):
+    _tempos_inicializacao[etapa] = round((time.perf_counter() - _INICIO_PROCESSO) * 1000, 1)
+    if "primeira_tela_ms" in _tempos_inicializacao and "carga_completa_ms" in _tempos_inicializacao:
+        relatar_tempos_inicializacao()
+
+def relatar_tempos_inicializacao():
+    registro = dict(_tempos_inicializacao, data=datetime.now().isoformat(timespec="seconds"),
+                    tarefas=len(_snapshot_render))
+    print(f"[INFO] Inicialização ({registro['modo']}): módulos {registro['modulos_ms']} ms, "
+          f"primeira tela {registro['primeira_tela_ms']} ms, carga completa {registro['carga_completa_ms']} ms")
+    historico_path = os.path.join(DATA_DIR, HISTORICO_INICIALIZACAO)
+    try:
+        historico = []
+        if os.path.exists(historico_path):
+            with open(historico_path, "r", encoding="utf-8") as f:
+                historico = [json.loads(linha) for linha in f if linha.strip()][-49:]
+        historico.append(registro)
+        with open(historico_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in historico)
+        for modo in ("frio", "quente"):
+            registros = [r for r in historico if r.get("modo") == modo]
+            if registros:
+                primeira = sorted(r["primeira_tela_ms"] for r in registros)[len(registros) // 2]
+                completa = sorted(r["carga_completa_ms"] for r in registros)[len(registros) // 2]
+                print(f"[INFO] Mediana {modo} ({len(registros)} execuções): primeira tela {primeira} ms, "
+                      f"carga completa {completa} ms")
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Erro ao gravar tempos de inicialização: {e}")
+
+# Função para inicializar a aplicação
 def inicializar_aplicacao():
     global estados
+    marcar_tempo_inicializacao("modulos_ms")
     estados = carregar_configuracoes()[1]
+    carregar_estado_sincronizacao()
+    carregar_fila_saida()
+    altura = altura_disponivel_colunas()
     for estado in estados:
-        criar_coluna(estado)
-    atualizar_tarefas()
-    listar_tarefas_em_execucao()
-    sincronizar_com_planilha()
+        criar_coluna(estado, altura)
+    rapido = obter_config("inicio_rapido", True)
+    _tempos_inicializacao["modo"] = "quente" if rapido and pintar_quadro_do_cache() else "frio"
+    janela.after_idle(lambda: marcar_tempo_inicializacao("primeira_tela_ms"))
+    janela.after_idle(aplicar_icone_janela)
+    if obter_config("painel_desempenho", False):
+        alternar_painel_desempenho()
+    if rapido:
+        threading.Thread(target=carregar_em_segundo_plano, daemon=True).start()
+    else:
+        concluir_inicializacao()
 
 # Modificar a inicialização da aplicação (unchanged)
 if __name__ == "__main__":
     inicializar_aplicacao()
     janela.bind("<Configure>", atualizar_layout_colunas)
-    janela.mainloop()
\ No newline at end of file
+    janela.mainloop()
+    salvar_cache_quadro()